@@ -0,0 +1,127 @@
+"""Class performance analytics and student rosters over grade rows.
+
+Everything is computed column-wise with pandas over one batch of rows per
+(studentClass, term) group, rather than looping over students and subjects.
+"""
+from typing import List, Optional
+
+import pandas as pd
+
+LETTER_GRADES = ["A", "B", "C", "D", "F"]
+
+
+def _round(value) -> float:
+    return round(float(value), 2)
+
+
+def _column_stats(column: pd.Series) -> dict:
+    return {
+        "mean": _round(column.mean()),
+        "std": _round(column.std(ddof=0)),
+        "median": _round(column.median()),
+        "min": _round(column.min()),
+        "max": _round(column.max()),
+    }
+
+
+def group_report(student_class: str, term: str, group: pd.DataFrame, subjects: List[str]) -> dict:
+    scores = group[subjects].astype(float)
+    averages = group["average"].astype(float)
+
+    # Rank 1 is the best score; ties share the better rank
+    ranks = averages.rank(ascending=False, method="min").astype(int)
+    # Share of the class scoring at or below each student
+    percentiles = averages.rank(pct=True, method="max") * 100
+    subject_ranks = scores.rank(ascending=False, method="min").astype(int)
+    distribution = group["grade"].value_counts().reindex(LETTER_GRADES, fill_value=0)
+
+    students = pd.DataFrame({
+        "studentId": group["studentId"],
+        "studentName": group["studentName"],
+        "average": averages.round(2),
+        "grade": group["grade"],
+        "rank": ranks,
+        "percentile": percentiles.round(2),
+    })
+    for subject in subjects:
+        students[f"{subject}Rank"] = subject_ranks[subject]
+    students = students.sort_values(["rank", "studentName"])
+
+    return {
+        "studentClass": student_class,
+        "term": term,
+        "count": int(len(group)),
+        "average": _column_stats(averages),
+        "subjects": {subject: _column_stats(scores[subject]) for subject in subjects},
+        "grade_distribution": {letter: int(count) for letter, count in distribution.items()},
+        "students": [
+            {
+                "studentId": row["studentId"],
+                "studentName": row["studentName"],
+                "average": float(row["average"]),
+                "grade": row["grade"],
+                "rank": int(row["rank"]),
+                "percentile": float(row["percentile"]),
+                "subject_ranks": {subject: int(row[f"{subject}Rank"]) for subject in subjects},
+            }
+            for row in students.to_dict("records")
+        ],
+    }
+
+
+def performance_report(rows: List[dict], subjects: List[str]) -> List[dict]:
+    if not rows:
+        return []
+    frame = pd.DataFrame(rows)
+    return [
+        group_report(student_class, term, group, subjects)
+        for (student_class, term), group in frame.groupby(["studentClass", "term"], sort=True)
+    ]
+
+
+def _optional(value) -> Optional[float]:
+    return None if pd.isna(value) else _round(value)
+
+
+def student_report(students: List[dict], grades: List[dict]) -> List[dict]:
+    """Per-class rosters with each student's term averages, overall average and class rank."""
+    if not students:
+        return []
+    roster = pd.DataFrame(students).set_index("id", drop=False)
+    if grades:
+        frame = pd.DataFrame(grades)
+        terms = frame.pivot_table(index="studentId", columns="term", values="average", aggfunc="mean")
+        roster["average"] = frame.groupby("studentId")["average"].mean()
+    else:
+        terms = pd.DataFrame()
+        roster["average"] = float("nan")
+    # Students without grades have no rank and are listed last
+    roster["rank"] = roster.groupby("studentClass")["average"].rank(ascending=False, method="min")
+    roster = roster.sort_values(["studentClass", "rank", "lastName", "firstName"], na_position="last")
+
+    classes = []
+    for student_class, group in roster.groupby("studentClass", sort=True):
+        classes.append({
+            "studentClass": student_class,
+            "count": int(len(group)),
+            "graded": int(group["average"].notna().sum()),
+            "gender": {gender: int(count) for gender, count in group["gender"].value_counts().items()},
+            "average": _optional(group["average"].mean()),
+            "students": [
+                {
+                    "id": row["id"],
+                    "firstName": row["firstName"],
+                    "lastName": row["lastName"],
+                    "gender": row["gender"],
+                    "terms": {
+                        term: _round(value)
+                        for term, value in (terms.loc[row["id"]].items() if row["id"] in terms.index else ())
+                        if not pd.isna(value)
+                    },
+                    "average": _optional(row["average"]),
+                    "rank": None if pd.isna(row["rank"]) else int(row["rank"]),
+                }
+                for row in group.to_dict("records")
+            ],
+        })
+    return classes
@@ -0,0 +1,34 @@
+"""Populate `search_terms` on students and teachers written before search existed.
+
+Runs entirely server-side with an update pipeline, so no documents are
+transferred. Legacy-shaped students are skipped here; migrate_students.py
+converts them and sets their search terms.
+
+    python backfill_search_terms.py
+"""
+import asyncio
+
+import typer
+
+from server import STUDENT_SEARCH_STAGE, TEACHER_SEARCH_STAGE, students_collection, teachers_collection
+
+app = typer.Typer()
+
+
+async def backfill() -> dict:
+    missing = {"search_terms": {"$exists": False}}
+    students = await students_collection.update_many(
+        {**missing, "firstName": {"$exists": True}}, [STUDENT_SEARCH_STAGE]
+    )
+    teachers = await teachers_collection.update_many(missing, [TEACHER_SEARCH_STAGE])
+    return {"students": students.modified_count, "teachers": teachers.modified_count}
+
+
+@app.command()
+def main():
+    result = asyncio.run(backfill())
+    typer.echo(f"Added search terms to {result['students']} students and {result['teachers']} teachers")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,48 @@
+"""Diff two benchmark result files (from micro.py or load.py).
+
+Prints every shared metric with its relative change, and exits non-zero when a
+latency metric got worse, or throughput got lower, by more than --threshold percent.
+
+    python benchmarks/compare.py baseline.json candidate.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is an improvement
+HIGHER_IS_BETTER = {"throughput_rps", "rows_per_second"}
+COMPARED = {"us_per_op", "throughput_rps", "rows_per_second", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    with open(args.candidate) as handle:
+        candidate = json.load(handle)
+    print(f"{baseline['commit']} -> {candidate['commit']}")
+
+    regressions = 0
+    for case, before in baseline["results"].items():
+        after = candidate["results"].get(case)
+        if after is None:
+            continue
+        for metric in sorted(COMPARED & before.keys() & after.keys()):
+            old, new = before[metric], after[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = ""
+            if worse > args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{case:<30} {metric:<16} {old:>12} -> {new:>12}  {change:+7.1f}%{flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Concurrent load scenarios against a local API instance.
+
+Targets a running server (--base-url, e.g. uvicorn on localhost:8001) or, with
+--in-process, the ASGI app itself through httpx (no sockets or uvicorn
+involved). Either way the app uses the MongoDB at MONGO_URL / DB_NAME, which
+should be a local throwaway database. Students created by the run are tagged
+with a per-run last name and deleted afterwards.
+
+    python benchmarks/load.py --in-process --concurrency 1,8,32 --output load.json
+    python benchmarks/compare.py baseline.json load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+import httpx
+from pymongo import MongoClient
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from common import summarize, write_results
+
+SCENARIOS = ["list", "get", "crud", "stats", "bulk"]
+
+
+def student_payload(marker: str, index: int) -> dict:
+    return {
+        "firstName": f"Student{index}",
+        "lastName": marker,
+        "gender": random.choice(["Male", "Female"]),
+        "dob": f"{random.randint(2010, 2020)}-0{random.randint(1, 9)}-1{random.randint(0, 9)}",
+        "studentClass": random.choice(["PP1", "Standard 1", "Standard 4", "Standard 8"]),
+        "enrollmentDate": "2024-01-08",
+        "parentName": "Load Test",
+        "relationship": "Parent",
+        "parentPhone": f"+265-999-{index:06d}",
+        "address": "Benchmark",
+    }
+
+
+def ndjson(marker: str, rows: int) -> bytes:
+    return "\n".join(json.dumps(student_payload(marker, i)) for i in range(rows)).encode()
+
+
+class Context:
+    def __init__(self, marker: str, bulk_rows: int):
+        self.marker = marker
+        self.bulk_rows = bulk_rows
+        self.ids = []
+
+
+async def op_list(client, ctx):
+    response = await client.get("/api/students", params={"limit": 100})
+    return response.status_code == 200
+
+
+async def op_get(client, ctx):
+    response = await client.get(f"/api/students/{random.choice(ctx.ids)}")
+    return response.status_code == 200
+
+
+async def op_crud(client, ctx):
+    # One create -> update -> delete cycle
+    created = await client.post("/api/students", json=student_payload(ctx.marker, random.randint(0, 10**6)))
+    if created.status_code != 200:
+        return False
+    student_id = created.json()["id"]
+    updated = await client.put(f"/api/students/{student_id}", json={"studentClass": "Standard 5"})
+    deleted = await client.delete(f"/api/students/{student_id}")
+    return updated.status_code == 200 and deleted.status_code == 200
+
+
+async def op_stats(client, ctx):
+    response = await client.get("/api/students/stats/overview")
+    return response.status_code == 200
+
+
+async def op_bulk(client, ctx):
+    response = await client.post(
+        "/api/students/bulk",
+        content=ndjson(ctx.marker, ctx.bulk_rows),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    return response.status_code == 200 and response.json()["failed"] == 0
+
+
+OPERATIONS = {"list": op_list, "get": op_get, "crud": op_crud, "stats": op_stats, "bulk": op_bulk}
+
+
+async def run_scenario(name: str, client, ctx: Context, concurrency: int, requests: int) -> dict:
+    operation = OPERATIONS[name]
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                ok = await operation(client, ctx)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = summarize(latencies, errors, time.perf_counter() - started)
+    if name == "bulk":
+        summary["rows_per_second"] = round(summary["throughput_rps"] * ctx.bulk_rows, 1)
+    return summary
+
+
+def make_client(args) -> httpx.AsyncClient:
+    timeout = httpx.Timeout(60.0)
+    if args.in_process:
+        from server import app
+
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=timeout)
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    return httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits)
+
+
+async def run(args) -> dict:
+    ctx = Context(marker=f"bench{uuid.uuid4().hex[:8]}", bulk_rows=args.bulk_rows)
+    students = MongoClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))[
+        os.environ.get("DB_NAME", "test_database")
+    ].students
+    results = {}
+    async with make_client(args) as client:
+        if args.in_process:
+            # ASGITransport does not run the lifespan handler
+            from server import ensure_indexes
+
+            await ensure_indexes()
+        try:
+            seeded = await client.post(
+                "/api/students/bulk", content=ndjson(ctx.marker, args.seed),
+                headers={"content-type": "application/x-ndjson"},
+            )
+            seeded.raise_for_status()
+            ctx.ids = students.distinct("id", {"lastName": ctx.marker})
+            for concurrency in args.concurrency:
+                for name in args.scenarios:
+                    key = f"{name}@{concurrency}"
+                    results[key] = await run_scenario(name, client, ctx, concurrency, args.requests)
+                    print(
+                        f"{key:<14} {results[key]['throughput_rps']:>9.1f} req/s  "
+                        f"p50 {results[key]['p50_ms']:>8.2f} ms  p95 {results[key]['p95_ms']:>8.2f} ms  "
+                        f"p99 {results[key]['p99_ms']:>8.2f} ms  errors {results[key]['errors']}"
+                    )
+        finally:
+            students.delete_many({"lastName": ctx.marker})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", default="http://localhost:8001")
+    target.add_argument("--in-process", action="store_true", help="Drive the ASGI app directly")
+    parser.add_argument("--concurrency", default="8", help="Concurrent clients, or a comma list to sweep")
+    parser.add_argument("--requests", type=int, default=500, help="Operations per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=1000, help="Students created before the run")
+    parser.add_argument("--bulk-rows", type=int, default=200, help="Rows per bulk import request")
+    parser.add_argument("--output", default="load.json")
+    args = parser.parse_args()
+    args.concurrency = [int(value) for value in args.concurrency.split(",")]
+    args.scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(run(args))
+    write_results(args.output, "load", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Micro-benchmarks for the per-document hot paths: helpers and Pydantic models.
+
+Each case reports the best-of-N time per operation in microseconds.
+
+    python benchmarks/micro.py --output micro.json
+"""
+import argparse
+import timeit
+import uuid
+from datetime import datetime
+
+import common  # noqa: F401  (puts the backend on sys.path)
+from common import write_results
+from server import (
+    STUDENT_SCHEMA_VERSION,
+    STUDENT_SEARCH_FIELDS,
+    StudentCreate,
+    StudentResponse,
+    grade_summary,
+    search_terms,
+    student_helper,
+)
+
+NOW = datetime.utcnow()
+STUDENT = {
+    "firstName": "Chikondi",
+    "lastName": "Phiri",
+    "gender": "Female",
+    "dob": "2014-05-17",
+    "studentClass": "Standard 4",
+    "enrollmentDate": "2024-01-08",
+    "parentName": "Grace Phiri",
+    "relationship": "Mother",
+    "parentPhone": "+265-999-000-000",
+    "address": "Area 47, Lilongwe",
+    "photo": "https://via.placeholder.com/50",
+}
+STORED = {**STUDENT, "id": str(uuid.uuid4()), "created_at": NOW, "updated_at": NOW}
+VERSIONED = {**STORED, "schema_version": STUDENT_SCHEMA_VERSION}
+LEGACY = {
+    "id": str(uuid.uuid4()),
+    "name": "Chikondi Phiri",
+    "class_name": "Standard 4",
+    "parent_name": "Grace Phiri",
+    "contact_phone": "+265-999-000-000",
+    "age": 10,
+    "created_at": NOW,
+    "updated_at": NOW,
+}
+STUDENT_MODEL = StudentCreate(**STUDENT)
+SCORES = {"english": 78, "chichewa": 85, "math": 92, "science": 74, "socialStudies": 69}
+
+CASES = {
+    "student_helper.versioned": lambda: student_helper(VERSIONED),
+    "student_helper.unversioned": lambda: student_helper(STORED),
+    "student_helper.legacy": lambda: student_helper(LEGACY),
+    "StudentCreate.validate": lambda: StudentCreate(**STUDENT),
+    "StudentCreate.dict": lambda: STUDENT_MODEL.dict(),
+    "StudentResponse.validate": lambda: StudentResponse(**student_helper(VERSIONED)),
+    "grade_summary": lambda: grade_summary(SCORES),
+    "search_terms": lambda: search_terms(STUDENT, STUDENT_SEARCH_FIELDS, "parentPhone"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=10000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs; the best is kept")
+    parser.add_argument("--output", default="micro.json")
+    args = parser.parse_args()
+
+    results = {}
+    for name, fn in CASES.items():
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+        results[name] = {"us_per_op": round(best / args.number * 1_000_000, 3)}
+        print(f"{name:<30} {results[name]['us_per_op']:>10.3f} us/op")
+    write_results(args.output, "micro", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Throughput of the API as the number of worker processes grows.
+
+For each worker count a fresh `uvicorn server:app --workers N` is started on a
+local port and the read scenarios from load.py are run against it. Use a
+shared state backend so the workers behave as they would in production:
+
+    SHARED_STATE_URL=redis://localhost:6379/0 python benchmarks/scaling.py --workers 1,2,4 --output scaling.json
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import BACKEND_DIR, write_results
+from load import SCENARIOS, run
+
+
+def wait_until_healthy(base_url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not become healthy within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="Comma list of worker counts")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Operations per scenario")
+    parser.add_argument("--scenarios", default="list,get,stats")
+    parser.add_argument("--seed", type=int, default=1000)
+    parser.add_argument("--output", default="scaling.json")
+    args = parser.parse_args()
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = {}
+    for workers in [int(value) for value in args.workers.split(",")]:
+        print(f"--- {workers} worker(s)")
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--port", str(args.port), "--workers", str(workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env=os.environ.copy(),
+        )
+        try:
+            wait_until_healthy(base_url, process)
+            load_args = argparse.Namespace(
+                in_process=False,
+                base_url=base_url,
+                concurrency=[args.concurrency],
+                requests=args.requests,
+                scenarios=scenarios,
+                seed=args.seed,
+                bulk_rows=200,
+            )
+            for key, summary in asyncio.run(run(load_args)).items():
+                results[f"{key}/workers={workers}"] = summary
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    baseline = {key.split("/")[0]: summary["throughput_rps"] for key, summary in results.items() if key.endswith("/workers=1")}
+    for key, summary in results.items():
+        scenario = key.split("/")[0]
+        if baseline.get(scenario):
+            summary["speedup"] = round(summary["throughput_rps"] / baseline[scenario], 2)
+    write_results(args.output, "scaling", {**vars(args), "shared_state": os.environ.get("SHARED_STATE_URL", "memory://")}, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Serialization cost of the student list response, per 1,000 students.
+
+"before" is the old list path: student_helper over full documents, FastAPI's
+response_model validation and json.dumps. "after" is the projected fast path:
+rows already shaped by STUDENT_PROJECTION, serialized by ORJSONResponse.
+
+    python benchmarks/serialization.py --rows 1000 --repeat 50
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime
+from typing import List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import ORJSONResponse  # noqa: E402
+from server import STUDENT_FIELDS, StudentResponse, student_helper  # noqa: E402
+
+
+def make_documents(rows: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "id": str(uuid.uuid4()),
+            "firstName": f"Student{i}",
+            "lastName": "Banda",
+            "gender": "Female" if i % 2 else "Male",
+            "dob": "2014-05-17",
+            "studentClass": "Standard 4",
+            "enrollmentDate": "2024-01-08",
+            "parentName": "Grace Banda",
+            "relationship": "Mother",
+            "parentPhone": "+265-999-000-000",
+            "address": "Area 47, Lilongwe",
+            "photo": "https://via.placeholder.com/50",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    documents = make_documents(args.rows)
+    projected = [{field: document[field] for field in STUDENT_FIELDS} for document in documents]
+    adapter = TypeAdapter(List[StudentResponse])
+
+    def before():
+        content = adapter.dump_python(adapter.validate_python([student_helper(d) for d in documents]), mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def after():
+        return ORJSONResponse(projected).body
+
+    scale = 1000 / args.rows
+    results = {}
+    for name, fn in (("before", before), ("after", after)):
+        seconds = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        results[name] = round(seconds * scale * 1000, 3)
+        print(f"{name:>6}: {results[name]:8.3f} ms per 1,000 students")
+    print(f"speedup: {results['before'] / results['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
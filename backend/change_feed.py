@@ -0,0 +1,324 @@
+"""Live collection counters and cache invalidation driven by MongoDB change streams.
+
+One background task per worker watches the configured collections. Every
+change updates in-memory counters (a total plus per-value counts of selected
+fields) and is handed to an `on_change` callback, which invalidates the
+caches built from that collection. A counted field may name fallback fields
+(e.g. a legacy name) that are read when it is missing, both when applying
+changes and when counting in the database. Changes made outside the API, e.g. by the
+CLI scripts, are therefore picked up as well.
+
+The resume token is saved together with the counters, so a restarted worker
+replays only the changes it missed instead of recounting. Change streams need
+a replica set; on a standalone mongod the feed falls back to polling
+`updated_at` and recounting the collections that changed.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+CHANGE_STREAM_UNSUPPORTED = {40573}  # "$changeStream stage is only supported on replica sets"
+UNKNOWN_FIELD = {40415}  # fullDocumentBeforeChange on servers older than 6.0
+HISTORY_LOST = {280, 286}  # resume token no longer in the oplog
+UNKNOWN = "unknown"
+
+
+class CollectionCounter:
+    """Total documents plus counts per value of each counted field.
+
+    `sources` maps a counted field to the document fields it is read from, the
+    first one present winning.
+    """
+
+    def __init__(self, sources: Dict[str, List[str]]):
+        self.sources = sources
+        self.fields = list(sources)
+        self.total = 0
+        self.by_field: Dict[str, Dict[str, int]] = {field: {} for field in self.fields}
+        # Cluster time of the last recount: earlier events are already included
+        self.synced_at = None
+
+    def value(self, document: dict, field: str):
+        return next((document[source] for source in self.sources[field] if document.get(source) is not None), None)
+
+    def expression(self, field: str):
+        # Aggregation equivalent of value()
+        expression = None
+        for source in reversed(self.sources[field]):
+            expression = f"${source}" if expression is None else {"$ifNull": [f"${source}", expression]}
+        return expression
+
+    def add(self, document: dict, sign: int) -> None:
+        self.total += sign
+        for field in self.fields:
+            counts = self.by_field[field]
+            value = str(self.value(document, field) or UNKNOWN)
+            counts[value] = counts.get(value, 0) + sign
+            if not counts[value]:
+                del counts[value]
+
+    def to_document(self) -> dict:
+        return {"total": self.total, "by_field": self.by_field, "sources": self.sources, "synced_at": self.synced_at}
+
+    def load(self, document: dict) -> None:
+        self.total = document["total"]
+        self.by_field = {field: dict(document["by_field"].get(field, {})) for field in self.fields}
+        self.synced_at = document.get("synced_at")
+
+
+class ChangeFeed:
+    def __init__(
+        self,
+        db,
+        counted_fields: Dict[str, Dict[str, List[str]]],
+        on_change: Callable[[str, List[dict]], Awaitable[None]],
+        state_collection: str = "change_feed_state",
+        poll_seconds: float = 5.0,
+        save_seconds: float = 5.0,
+        pre_images: bool = True,
+    ):
+        self.db = db
+        self.on_change = on_change
+        self.state = db[state_collection]
+        self.poll_seconds = poll_seconds
+        self.save_seconds = save_seconds
+        self.pre_images = pre_images
+        self.counters = {name: CollectionCounter(sources) for name, sources in counted_fields.items()}
+        self.mode = "starting"
+        self.ready = False
+        self.resume_token = None
+        self.watermarks: Dict[str, Optional[datetime]] = {}
+        self.estimates: Dict[str, int] = {}
+        self.events = 0
+        self.recounts = 0
+        self.failures = 0
+        self.updated_at: Optional[datetime] = None
+        self._saved = 0.0
+
+    # Persistence
+
+    async def load(self) -> List[str]:
+        """Restore saved counters; returns the collections that still need a recount."""
+        saved = await self.state.find_one({"_id": "counters"}) or {}
+        self.resume_token = saved.get("resume_token")
+        self.watermarks = saved.get("watermarks", {})
+        self.estimates = saved.get("estimates", {})
+        missing = []
+        for name, counter in self.counters.items():
+            # Counters saved for other fields or sources are counted again
+            if saved.get("counters", {}).get(name, {}).get("sources") == counter.sources:
+                counter.load(saved["counters"][name])
+            else:
+                missing.append(name)
+        if missing:
+            # Counters and the resume token are only valid together
+            self.resume_token = None
+        return missing
+
+    async def save(self) -> None:
+        await self.state.replace_one(
+            {"_id": "counters"},
+            {
+                "resume_token": self.resume_token,
+                "counters": {name: counter.to_document() for name, counter in self.counters.items()},
+                "watermarks": self.watermarks,
+                "estimates": self.estimates,
+                "mode": self.mode,
+                "saved_at": datetime.utcnow(),
+            },
+            upsert=True,
+        )
+        self._saved = time.monotonic()
+
+    async def save_if_due(self) -> None:
+        if time.monotonic() - self._saved >= self.save_seconds:
+            await self.save()
+
+    # Counting
+
+    async def count(self, name: str) -> CollectionCounter:
+        """Count `name` from scratch into a new counter, without touching the live one."""
+        counter = CollectionCounter(self.counters[name].sources)
+        facets = {"total": [{"$count": "count"}]}
+        for field in counter.fields:
+            facets[field] = [{"$group": {"_id": counter.expression(field), "count": {"$sum": 1}}}]
+        async with await self.db.client.start_session() as session:
+            result = await self.db[name].aggregate([{"$facet": facets}], session=session).to_list(1)
+            counter.synced_at = session.operation_time
+        facets = result[0]
+        counter.total = facets["total"][0]["count"] if facets["total"] else 0
+        counter.by_field = {
+            field: {str(row["_id"] or UNKNOWN): row["count"] for row in facets[field]} for field in counter.fields
+        }
+        return counter
+
+    async def recount(self, name: str) -> None:
+        self.counters[name] = await self.count(name)
+        self.recounts += 1
+
+    @staticmethod
+    def touches_counted_fields(event: dict, counter: CollectionCounter) -> bool:
+        if event["operationType"] != "update":
+            return True
+        description = event["updateDescription"]
+        changed = {*description["updatedFields"], *description.get("removedFields", [])}
+        return any(source in changed for sources in counter.sources.values() for source in sources)
+
+    async def apply(self, event: dict) -> None:
+        name = event["ns"]["coll"]
+        counter = self.counters[name]
+        operation = event["operationType"]
+        before = event.get("fullDocumentBeforeChange")
+        after = event.get("fullDocument")
+        documents = [document for document in (before, after) if document]
+
+        if counter.synced_at is None or event["clusterTime"] > counter.synced_at:
+            if operation == "insert":
+                counter.add(after, 1)
+            elif operation == "delete":
+                if before or not counter.fields:
+                    counter.add(before or {}, -1)
+                else:
+                    await self.recount(name)
+            elif counter.fields and self.touches_counted_fields(event, counter):
+                if operation == "update" and before:
+                    description = event["updateDescription"]
+                    after = {**before, **description["updatedFields"]}
+                    for field in description.get("removedFields", []):
+                        after.pop(field, None)
+                if before and after:
+                    counter.add(before, -1)
+                    counter.add(after, 1)
+                else:
+                    # Old values unknown (no pre-image): count again
+                    await self.recount(name)
+
+        self.events += 1
+        self.updated_at = datetime.utcnow()
+        await self.on_change(name, documents)
+
+    # Change stream
+
+    async def enable_pre_images(self) -> None:
+        for name, counter in self.counters.items():
+            try:
+                await self.db.command("collMod", name, changeStreamPreAndPostImages={"enabled": True})
+            except PyMongoError as e:
+                logger.info("Change stream pre-images unavailable for %s: %s", name, e)
+
+    async def stream(self, missing: List[str]) -> None:
+        options = {"full_document": "updateLookup", "max_await_time_ms": 1000}
+        if self.pre_images:
+            options["full_document_before_change"] = "whenAvailable"
+        if self.resume_token:
+            options["resume_after"] = self.resume_token
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(self.counters)},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+        }}]
+        async with self.db.watch(pipeline, **options) as stream:
+            # Counted only once the stream is open, so no change falls in between
+            for name in missing:
+                await self.recount(name)
+            missing.clear()
+            self.mode = "change_stream"
+            self.ready = True
+            self.failures = 0
+            while stream.alive:
+                event = await stream.try_next()
+                if event is not None:
+                    await self.apply(event)
+                self.resume_token = stream.resume_token
+                await self.save_if_due()
+
+    # Polling fallback
+
+    async def poll(self, missing: List[str]) -> None:
+        self.mode = "polling"
+        while True:
+            for name in self.counters:
+                collection = self.db[name]
+                latest = await collection.find_one({}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", -1)])
+                watermark = latest.get("updated_at") if latest else None
+                # Deletes leave updated_at alone but change the count
+                estimate = await collection.estimated_document_count()
+                if name in missing or watermark != self.watermarks.get(name) or estimate != self.estimates.get(name):
+                    await self.recount(name)
+                    self.watermarks[name] = watermark
+                    self.estimates[name] = estimate
+                    if name not in missing:
+                        self.events += 1
+                        self.updated_at = datetime.utcnow()
+                        await self.on_change(name, [])
+            missing.clear()
+            self.ready = True
+            self.failures = 0
+            await self.save_if_due()
+            await asyncio.sleep(self.poll_seconds)
+
+    async def run(self) -> None:
+        missing = None
+        polling = False
+        try:
+            while True:
+                try:
+                    if missing is None:
+                        missing = await self.load()
+                        if self.pre_images:
+                            await self.enable_pre_images()
+                    if polling:
+                        await self.poll(missing)
+                    else:
+                        await self.stream(missing)
+                except OperationFailure as e:
+                    if e.code in CHANGE_STREAM_UNSUPPORTED:
+                        logger.info("Change streams unavailable, polling every %ss instead", self.poll_seconds)
+                        polling = True
+                    elif e.code in UNKNOWN_FIELD and self.pre_images:
+                        self.pre_images = False
+                    elif e.code in HISTORY_LOST:
+                        logger.warning("Change stream history lost, recounting: %s", e)
+                        self.resume_token = None
+                        missing = list(self.counters)
+                    else:
+                        await self.backoff(e)
+                        missing = None
+                except Exception as e:
+                    # Includes failures of on_change, e.g. the shared state backend being down
+                    await self.backoff(e)
+                    missing = None
+        finally:
+            if self.ready:
+                await asyncio.shield(self.save())
+
+    async def backoff(self, error: Exception) -> None:
+        """Mark the counters stale and wait before retrying.
+
+        A change may have been counted but not fully handled, so the caller
+        drops the in-memory counters for the last saved counters and resume
+        token, which are only ever saved together.
+        """
+        self.ready = False
+        self.mode = "retrying"
+        delay = min(2 ** self.failures, 30)
+        self.failures += 1
+        logger.warning("Change feed interrupted, retrying in %ss: %s", delay, error)
+        await asyncio.sleep(delay)
+
+    def snapshot(self) -> dict:
+        return {
+            "mode": self.mode,
+            "ready": self.ready,
+            "events": self.events,
+            "recounts": self.recounts,
+            "updated_at": self.updated_at,
+            "counters": {
+                name: {"total": counter.total, **counter.by_field} for name, counter in self.counters.items()
+            },
+        }
@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Dict
+
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.staticfiles import NotModifiedResponse
+
+from files import write_atomic
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are generated
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".css", ".svg", ".json", ".txt", ".xml"}
+# Content types that are already compressed, or must reach the client unbuffered
+UNCOMPRESSED_CONTENT_TYPES = ("text/event-stream", "application/gzip", "application/zip", "image/", "font/woff")
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class SelectiveGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message):
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            await super().send_with_gzip(message)
+            # Take the same pass-through path as an already-encoded response
+            if content_type.startswith(UNCOMPRESSED_CONTENT_TYPES):
+                self.content_encoding_set = True
+            return
+        await super().send_with_gzip(message)
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """Starlette's GZipMiddleware, minus event streams and already-compressed downloads.
+
+    Responses that carry a Content-Encoding (precompressed static files) are
+    passed through untouched, as in the parent class.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = SelectiveGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def _write_variants(path: Path, data: bytes, minimum_size: int) -> None:
+    variants = {}
+    if path.suffix in COMPRESSIBLE_SUFFIXES and len(data) >= minimum_size:
+        variants[".gz"] = gzip.compress(data, compresslevel=9, mtime=0)
+        if brotli is not None:
+            variants[".br"] = brotli.compress(data, quality=11)
+    for suffix in (".gz", ".br"):
+        variant = path.with_name(path.name + suffix)
+        compressed = variants.get(suffix)
+        if compressed is not None and len(compressed) < len(data):
+            write_atomic(variant, compressed)
+        else:
+            # Pages keep their names across builds; never leave an outdated variant behind
+            variant.unlink(missing_ok=True)
+
+
+def build_assets(source: Path, target: Path, minimum_size: int = 1024) -> Dict[str, str]:
+    """Copy the static site into `target` with content-hashed asset names.
+
+    Scripts, styles and other assets get a hash of their content in the file
+    name; HTML pages keep their names and have their references rewritten.
+    Every compressible file gets .gz (and, with brotli installed, .br)
+    variants. Files from earlier builds are left in place, so a page cached
+    before a deploy can still load the assets it references.
+
+    Returns the manifest of original name -> hashed name.
+    """
+    target.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    pages = []
+    for path in sorted(source.iterdir()):
+        if not path.is_file() or path.name.startswith("."):
+            continue
+        if path.suffix == ".html":
+            pages.append(path)
+            continue
+        data = path.read_bytes()
+        hashed = f"{path.stem}.{hashlib.sha256(data).hexdigest()[:12]}{path.suffix}"
+        manifest[path.name] = hashed
+        write_atomic(target / hashed, data)
+        _write_variants(target / hashed, data, minimum_size)
+
+    if manifest:
+        reference = re.compile(r'((?:src|href)=["\'])(?:\./)?(' + "|".join(map(re.escape, manifest)) + r')(["\'?#])')
+    for path in pages:
+        html = path.read_text(encoding="utf-8")
+        if manifest:
+            html = reference.sub(lambda match: match.group(1) + manifest[match.group(2)] + match.group(3), html)
+        data = html.encode("utf-8")
+        write_atomic(target / path.name, data)
+        _write_variants(target / path.name, data, minimum_size)
+
+    logger.info("Built %d static assets and %d pages into %s", len(manifest), len(pages), target)
+    return manifest
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves the .br / .gz variants written by build_assets.
+
+    With html=True, an extensionless path is also tried as an .html page.
+
+    Hashed assets are cached for a year as immutable; everything else (the HTML
+    pages) must be revalidated, which is cheap thanks to the ETag.
+    """
+
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    def lookup_path(self, path: str):
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result is None and self.html and path and not Path(path).suffix:
+            # Pages are linked without their extension, e.g. /portal for portal.html
+            return super().lookup_path(path + ".html")
+        return full_path, stat_result
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        accepted = {token.split(";")[0].strip() for token in request_headers.get("accept-encoding", "").split(",")}
+        response = None
+        for encoding, suffix in self.ENCODINGS:
+            variant = f"{full_path}{suffix}"
+            if encoding in accepted and os.path.isfile(variant):
+                response = FileResponse(
+                    variant,
+                    status_code=status_code,
+                    stat_result=os.stat(variant),
+                    media_type=mimetypes.guess_type(str(full_path))[0],
+                    headers={"Content-Encoding": encoding},
+                )
+                break
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        headers = response.headers
+        headers["Cache-Control"] = IMMUTABLE if HASHED_NAME.search(str(full_path)) else "no-cache"
+        if Path(full_path).suffix in COMPRESSIBLE_SUFFIXES:
+            headers.add_vary_header("Accept-Encoding")
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,179 @@
+import math
+import time
+import uuid
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.routing import Match
+
+
+class CollectionVersions:
+    """Per-collection change counters, used as cheap HTTP validators.
+
+    The counters live in the shared state backend, so every worker hands out the
+    same validators. ETags also carry an epoch stored next to the counters: if
+    the counters are lost (a restart with the memory backend, a Redis flush) a
+    new epoch is created and old ETags stop matching. Writes made outside the
+    API (the CLI scripts) are caught by the change feed, which bumps the same
+    counters.
+    """
+
+    EPOCH_KEY = "versions:epoch"
+
+    def __init__(self, state):
+        self.state = state
+
+    async def bump(self, names: Iterable[str]) -> None:
+        changed = math.ceil(time.time())
+        for name in names:
+            await self.state.incr(f"versions:{name}")
+            await self.state.set(f"versions:{name}:changed", changed)
+
+    async def _values(self, names: Tuple[str, ...]) -> Tuple[Optional[str], List[Optional[str]], List[Optional[str]]]:
+        values = await self.state.get_many(
+            [self.EPOCH_KEY, *(f"versions:{name}" for name in names), *(f"versions:{name}:changed" for name in names)]
+        )
+        return values[0], values[1:len(names) + 1], values[len(names) + 1:]
+
+    async def current(self, names: Tuple[str, ...]) -> Tuple[str, int]:
+        """The ETag and Last-Modified (whole epoch seconds) for responses built from `names`."""
+        epoch, counters, changed = await self._values(names)
+        if epoch is None:
+            epoch = f"{uuid.uuid4().hex[:8]}:{math.ceil(time.time())}"
+            await self.state.set(self.EPOCH_KEY, epoch)
+        epoch, created = epoch.split(":")
+        etag = f'W/"{epoch}-{".".join(counter or "0" for counter in counters)}"'
+        return etag, max((int(value) for value in changed if value is not None), default=int(created))
+
+    async def stats(self, names: Iterable[str]) -> dict:
+        names = tuple(names)
+        epoch, counters, changed = await self._values(names)
+        return {
+            "epoch": epoch,
+            "collections": {
+                name: {
+                    "version": int(counter or 0),
+                    "changed_at": datetime.utcfromtimestamp(int(changed_at)).isoformat() if changed_at else None,
+                }
+                for name, counter, changed_at in zip(names, counters, changed)
+            },
+        }
+
+
+def _lookup(table: Dict[str, Tuple[str, ...]], path: str) -> Optional[Tuple[str, ...]]:
+    for prefix, names in table.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            return names
+    return None
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: int) -> bool:
+    try:
+        return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class ConditionalGetMiddleware:
+    """ETag / Last-Modified support for read endpoints, backed by CollectionVersions.
+
+    `reads` maps path prefixes to the collections their GET responses depend on,
+    `writes` maps path prefixes to the collections a mutating request may change,
+    except the paths in `exempt` (POST endpoints that only read).
+    A GET whose validators still match is answered with 304 before routing, so
+    the handler, the query and the serialization are all skipped.
+
+    A write bumps its collections both before and after it runs: a validator
+    handed out while the write was in flight never survives it. Last-Modified
+    has one-second resolution, so it is only sent once the second of the last
+    change is over; until then the ETag alone identifies the version.
+    """
+
+    def __init__(
+        self,
+        app,
+        versions: CollectionVersions,
+        reads: Dict[str, Tuple[str, ...]],
+        writes: Dict[str, Tuple[str, ...]],
+        exempt: Iterable[str] = (),
+    ):
+        self.app = app
+        self.versions = versions
+        self.reads = reads
+        self.writes = writes
+        self.exempt = frozenset(exempt)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] not in ("GET", "HEAD"):
+            names = None if scope["path"] in self.exempt else _lookup(self.writes, scope["path"])
+            if names is None:
+                await self.app(scope, receive, send)
+                return
+            await self.versions.bump(names)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                await self.versions.bump(names)
+            return
+
+        names = _lookup(self.reads, scope["path"])
+        if names is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag, last_modified = await self.versions.current(names)
+        validators = [
+            (b"etag", etag.encode()),
+            # Cached copies must be revalidated, never served on heuristic freshness
+            (b"cache-control", b"no-cache"),
+        ]
+        if time.time() > last_modified:
+            validators.append((b"last-modified", formatdate(last_modified, usegmt=True).encode()))
+
+        if_none_match = _header(scope, b"if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = _header(scope, b"if-modified-since")
+            not_modified = if_modified_since is not None and _not_modified_since(if_modified_since, last_modified)
+        if not_modified:
+            self.match_route(scope)
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message["headers"] = [*message.get("headers", []), *validators]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def match_route(scope) -> None:
+        # Record the route as the router would, so 304s keep their route label in /metrics
+        for route in scope["app"].router.routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                scope.update(child_scope)
+                return
@@ -0,0 +1,44 @@
+"""Create or reset a portal login.
+
+Runs with the server's environment (MONGO_URL, DB_NAME, SECRET_KEY).
+
+    python create_user.py admin --role admin
+"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import typer
+
+from server import ROLE_PERMISSIONS, hash_password, users_collection
+
+app = typer.Typer()
+
+
+async def save_user(username: str, password: str, role: str) -> bool:
+    now = datetime.utcnow()
+    result = await users_collection.update_one(
+        {"username": username},
+        {
+            "$set": {"password_hash": hash_password(password), "role": role, "updated_at": now},
+            "$setOnInsert": {"id": str(uuid.uuid4()), "permissions": [], "created_at": now},
+        },
+        upsert=True,
+    )
+    return result.upserted_id is not None
+
+
+@app.command()
+def main(
+    username: str,
+    password: str = typer.Option(..., prompt=True, hide_input=True, confirmation_prompt=True),
+    role: str = typer.Option("staff", help=f"One of: {', '.join(ROLE_PERMISSIONS)}"),
+):
+    if role not in ROLE_PERMISSIONS:
+        raise typer.BadParameter(f"Unknown role {role!r}", param_hint="--role")
+    created = asyncio.run(save_user(username, password, role))
+    typer.echo(f"{'Created' if created else 'Updated'} {role} user {username}")
+
+
+if __name__ == "__main__":
+    app()
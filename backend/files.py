@@ -0,0 +1,15 @@
+import os
+from pathlib import Path
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Replace `path` with `data` in one step, so a reader never sees a half-written file.
+
+    Several workers may write the same file at once; the temporary name carries
+    the pid so they never share one. Unchanged files are left alone.
+    """
+    if path.exists() and path.read_bytes() == data:
+        return
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
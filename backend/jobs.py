@@ -0,0 +1,239 @@
+"""Background jobs for reports too heavy to build inside a request.
+
+A job is queued by kind and parameters and picked up by one of a fixed number
+of asyncio workers. The worker loads the data with the async driver and hands
+the CPU-bound part to a process pool, so neither the event loop nor the GIL is
+held while a report is computed. Submitting a job identical to one that is
+still queued or running returns the existing job instead of a new one.
+
+Job state and results are written to `directory`, so any worker process on the
+same host can answer status and result requests. Finished jobs expire after
+`result_ttl` seconds; so does a job left unfinished by a worker that died.
+"""
+import asyncio
+import logging
+import multiprocessing
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+
+from files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ("done", "failed")
+JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class Job:
+    def __init__(self, queue: "JobQueue", kind: str, params: dict, key: str):
+        self.queue = queue
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.key = key
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = "Queued"
+        self.error: Optional[str] = None
+        self.version = 0
+        self.created_at = datetime.utcnow().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.changed = asyncio.Event()
+
+    def report(self, progress: float, message: str) -> None:
+        """Record progress (0..1) and wake up anyone streaming it."""
+        self.progress = round(min(max(progress, 0.0), 1.0), 4)
+        self.message = message
+        self.version += 1
+        # State files are a few hundred bytes; writing them inline is cheaper than a thread hop
+        write_atomic(self.queue.state_path(self.id), orjson.dumps(self.to_dict()))
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "version": self.version,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+Runner = Callable[[Job], Awaitable[Any]]
+
+
+class JobQueue:
+    def __init__(
+        self,
+        directory: Path,
+        runners: Dict[str, Runner],
+        workers: int = 2,
+        processes: int = 2,
+        queue_size: int = 100,
+        result_ttl: float = 3600.0,
+    ):
+        self.directory = Path(directory)
+        self.runners = runners
+        self.workers = workers
+        self.processes = processes
+        self.result_ttl = result_ttl
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.jobs: Dict[str, Job] = {}
+        # Queued or running jobs by kind + parameters, for deduplication
+        self.pending: Dict[str, Job] = {}
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.tasks = []
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+
+    def state_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def result_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.result.json"
+
+    async def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # spawn: forking a process that runs an event loop and driver threads is unsafe
+        self.executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+        self.tasks = [asyncio.create_task(self.work()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self.sweep()))
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, kind: str, params: dict) -> Tuple[Job, bool]:
+        """Queue a job; returns it and whether an identical pending job was reused.
+
+        Raises asyncio.QueueFull when the queue is at capacity.
+        """
+        key = kind + ":" + orjson.dumps(params, option=orjson.OPT_SORT_KEYS).decode()
+        existing = self.pending.get(key)
+        if existing is not None:
+            self.deduplicated += 1
+            return existing, True
+        job = Job(self, kind, params, key)
+        self.queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self.pending[key] = job
+        self.submitted += 1
+        job.report(0.0, "Queued")
+        return job, False
+
+    async def run_in_process(self, func: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def _expired(self, path: Path) -> bool:
+        try:
+            return time.time() - path.stat().st_mtime > self.result_ttl
+        except FileNotFoundError:
+            return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Current state of a job run by any worker on this host, or None if unknown or expired."""
+        if not JOB_ID.match(job_id):
+            return None
+        job = self.jobs.get(job_id)
+        if job is not None and job.status not in FINISHED:
+            return job.to_dict()
+        path = self.state_path(job_id)
+        if self._expired(path):
+            return None
+        try:
+            return orjson.loads(path.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return None
+
+    async def wait(self, job_id: str, timeout: float) -> bool:
+        """Wait for the next change of a job; returns False if none came within `timeout`."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            # Run by another worker: its state file is polled instead
+            await asyncio.sleep(min(timeout, 1.0))
+            return False
+        try:
+            await asyncio.wait_for(job.changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def work(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                await self.run(job)
+            finally:
+                self.pending.pop(job.key, None)
+                # Finished jobs are served from disk, like those of other workers
+                self.jobs.pop(job.id, None)
+                self.queue.task_done()
+
+    async def run(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = datetime.utcnow().isoformat()
+        job.report(0.0, "Started")
+        try:
+            result = await self.runners[job.kind](job)
+            job.report(0.95, "Saving result")
+            await asyncio.to_thread(write_atomic, self.result_path(job.id), orjson.dumps(result))
+        except asyncio.CancelledError:
+            self.finish(job, "failed", "Worker shut down")
+            raise
+        except Exception as e:
+            logger.exception("Report job %s (%s) failed", job.id, job.kind)
+            self.failed += 1
+            self.finish(job, "failed", str(e))
+        else:
+            self.completed += 1
+            self.finish(job, "done")
+
+    @staticmethod
+    def finish(job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.utcnow().isoformat()
+        job.report(1.0 if status == "done" else job.progress, "Done" if status == "done" else "Failed")
+
+    async def sweep(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.result_ttl, 60.0))
+            try:
+                for path in self.directory.glob("*.json"):
+                    if path.name.split(".")[0] not in self.jobs and self._expired(path):
+                        path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("Report result cleanup failed: %s", e)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "processes": self.processes,
+            "queued": self.queue.qsize(),
+            "running": sum(job.status == "running" for job in self.jobs.values()),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+            "result_ttl": self.result_ttl,
+        }
@@ -0,0 +1,126 @@
+"""Rewrite stored student documents to the current schema.
+
+Legacy fields (name / class_name / parent_name / contact_phone) that a document
+still shows are renamed in place to the current ones, and every unversioned
+document is stamped with STUDENT_SCHEMA_VERSION. Fields the document never held (dob,
+gender, ...) are left out rather than filled with placeholders, and unrelated
+legacy data such as `age` is kept.
+
+Progress is recorded in the `migrations` collection after every batch; an
+interrupted run picks up after the last migrated document.
+
+    python migrate_students.py --batch-size 500
+"""
+import asyncio
+from datetime import datetime
+from typing import List, Tuple
+
+import typer
+from pymongo import UpdateOne
+
+from server import (
+    STUDENT_FIELD_SOURCES,
+    STUDENT_SCHEMA_VERSION,
+    STUDENT_SEARCH_FIELDS,
+    db,
+    search_terms,
+    students_collection,
+)
+
+MIGRATION_ID = f"students_schema_v{STUDENT_SCHEMA_VERSION}"
+# Legacy field -> current field; `name` is split into firstName/lastName
+LEGACY_FIELDS = {legacy: field for field, (legacy, _) in STUDENT_FIELD_SOURCES.items() if legacy}
+
+migrations_collection = db.migrations
+
+app = typer.Typer()
+
+
+def migrated_fields(student: dict) -> Tuple[dict, List[str]]:
+    """Fields to set and legacy fields to unset, resolving each field as student_helper does.
+
+    Only values the document actually holds are written; optional fields the
+    legacy schema never had (dob, gender, relationship, ...) stay absent and
+    student_helper keeps filling in its defaults for them on read.
+    """
+    fields, unset = {}, []
+    if student.get("firstName") is None or student.get("lastName") is None:
+        if student.get("name") is not None:
+            name_parts = student["name"].split(" ", 1)
+            if student.get("firstName") is None:
+                fields["firstName"] = name_parts[0]
+            if student.get("lastName") is None:
+                fields["lastName"] = name_parts[1] if len(name_parts) > 1 else ""
+            unset.append("name")
+    for legacy, field in LEGACY_FIELDS.items():
+        if student.get(field) is None and student.get(legacy) is not None:
+            fields[field] = student[legacy]
+            unset.append(legacy)
+    fields["schema_version"] = STUDENT_SCHEMA_VERSION
+    fields["search_terms"] = search_terms({**student, **fields}, STUDENT_SEARCH_FIELDS, "parentPhone")
+    return fields, unset
+
+
+async def migrate(batch_size: int, reset: bool, dry_run: bool) -> dict:
+    if reset:
+        await migrations_collection.delete_one({"_id": MIGRATION_ID})
+    progress = await migrations_collection.find_one({"_id": MIGRATION_ID}) or {"migrated": 0}
+    if progress.get("completed_at"):
+        typer.echo(f"{MIGRATION_ID} already completed at {progress['completed_at']}")
+        return progress
+
+    query = {"schema_version": {"$ne": STUDENT_SCHEMA_VERSION}}
+    if progress.get("last_id"):
+        query["_id"] = {"$gt": progress["last_id"]}
+    cursor = students_collection.find(query).sort("_id", 1).batch_size(batch_size)
+
+    migrated = progress["migrated"]
+    batch = []
+    last_id = None
+
+    async def flush():
+        nonlocal migrated
+        if not dry_run:
+            await students_collection.bulk_write(batch, ordered=False)
+            await migrations_collection.update_one(
+                {"_id": MIGRATION_ID},
+                {"$set": {"last_id": last_id, "migrated": migrated + len(batch), "updated_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        migrated += len(batch)
+        typer.echo(f"migrated {migrated} students")
+        batch.clear()
+
+    async for student in cursor:
+        fields, unset = migrated_fields(student)
+        update = {"$set": fields}
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+        batch.append(UpdateOne({"_id": student["_id"]}, update))
+        last_id = student["_id"]
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    if not dry_run:
+        await migrations_collection.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"migrated": migrated, "completed_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    return {"migrated": migrated}
+
+
+@app.command()
+def main(
+    batch_size: int = typer.Option(500, min=1, help="Documents rewritten per bulk_write"),
+    reset: bool = typer.Option(False, help="Forget recorded progress and start over"),
+    dry_run: bool = typer.Option(False, help="Report what would be migrated without writing"),
+):
+    result = asyncio.run(migrate(batch_size, reset, dry_run))
+    typer.echo(f"{MIGRATION_ID}: {result['migrated']} students migrated")
+
+
+if __name__ == "__main__":
+    app()
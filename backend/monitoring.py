@@ -0,0 +1,271 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observing is a bisect and two additions, no allocation."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def render_counter(name: str, help_text: str, names: Tuple[str, ...], series: Dict[Tuple, float], kind: str = "counter") -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_labels(names, key)} {value}" for key, value in series.items())
+    return lines
+
+
+def render_histogram(name: str, help_text: str, names: Tuple[str, ...], series: Dict[Tuple, Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    bucket_names = names + ("le",)
+    for key, histogram in series.items():
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(bucket_names, key + (bound,))} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(bucket_names, key + ('+Inf',))} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(names, key)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(names, key)} {histogram.count}")
+    return lines
+
+
+class HttpMetrics:
+    """Per-route request metrics. Only touched from the event loop thread, so no locks."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.response_size: Dict[Tuple[str, str], Histogram] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.response_size[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(seconds)
+        self.response_size[key].observe(size)
+        status_key = (method, route, status)
+        self.requests[status_key] = self.requests.get(status_key, 0) + 1
+        if status >= 500:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def render(self) -> List[str]:
+        return [
+            *render_counter("http_requests_in_flight", "Requests currently being handled.", (), {(): self.in_flight}, "gauge"),
+            *render_counter("http_requests_total", "Requests by route and status.", ("method", "route", "status"), self.requests),
+            *render_counter("http_request_errors_total", "Requests that failed with a 5xx status.", ("method", "route"), self.errors),
+            *render_histogram("http_request_duration_seconds", "Request latency.", ("method", "route"), self.latency),
+            *render_histogram("http_response_size_bytes", "Response body size.", ("method", "route"), self.response_size),
+        ]
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware wrapping, so streaming responses are untouched)."""
+
+    def __init__(self, app, metrics: HttpMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            # The router stores the matched route in the scope; label by its template
+            # so /api/students/{student_id} is one series, not one per id
+            route = scope.get("route")
+            metrics.record(scope["method"], getattr(route, "path", "unmatched"), status, time.perf_counter() - started, size)
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Times every MongoDB command by collection and command name.
+
+    Events arrive on Motor's executor threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple, Tuple[str, str]] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.failures: Dict[Tuple[str, str], int] = {}
+
+    @staticmethod
+    def collection(command_name: str, command) -> str:
+        # A command names its collection as the value of its first key, except getMore
+        # (that is the cursor id); database-level commands (aggregate: 1, ping, ...) get "(db)"
+        target = command.get("collection") if command_name == "getMore" else command.get(command_name)
+        return target if isinstance(target, str) else "(db)"
+
+    def started(self, event):
+        labels = (self.collection(event.command_name, event.command), event.command_name)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = labels
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            labels = self._pending.pop((event.connection_id, event.request_id), None)
+            if labels is None:
+                return
+            histogram = self.latency.get(labels)
+            if histogram is None:
+                histogram = self.latency[labels] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(event.duration_micros / 1_000_000)
+            if failed:
+                self.failures[labels] = self.failures.get(labels, 0) + 1
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [
+                *render_histogram("mongodb_command_duration_seconds", "MongoDB command latency.", ("collection", "command"), self.latency),
+                *render_counter("mongodb_command_failures_total", "Failed MongoDB commands.", ("collection", "command"), self.failures),
+            ]
+
+
+def render_metrics(sections: Iterable[List[str]]) -> str:
+    return "\n".join(line for section in sections for line in section) + "\n"
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Tracks connection pool usage and how long operations wait to check out a connection.
+
+    pymongo publishes pool events synchronously on the thread doing the checkout
+    (a Motor executor thread), so the start time is kept thread-locally.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._recent_waits = deque(maxlen=window)
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checked_out = 0
+        self.connections = 0
+        self.pool_clears = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent_waits.append(wait)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def render(self) -> List[str]:
+        stats = self.stats()
+        return [
+            *render_counter("mongodb_pool_connections", "Open pool connections.", (), {(): stats["connections"]}, "gauge"),
+            *render_counter("mongodb_pool_checked_out", "Connections currently checked out.", (), {(): stats["checked_out"]}, "gauge"),
+            *render_counter("mongodb_pool_checkouts_total", "Connection checkouts.", (), {(): stats["checkouts"]}),
+            *render_counter("mongodb_pool_checkout_failures_total", "Failed connection checkouts.", (), {(): stats["checkout_failures"]}),
+            *render_counter("mongodb_pool_checkout_wait_seconds_total", "Time spent waiting for a connection.", (), {(): self.total_wait}),
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent_waits)
+            checkouts = self.checkouts
+            return {
+                "connections": self.connections,
+                "checked_out": self.checked_out,
+                "checkouts": checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+                "wait_ms": {
+                    "mean": round(self.total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                    "max": round(self.max_wait * 1000, 3),
+                    "p95_recent": round(recent[int(len(recent) * 0.95)] * 1000, 3) if recent else 0.0,
+                },
+            }
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Dict, Optional, Set
+
+
+class Subscriber:
+    """One connected client: a bounded queue plus the audience it listens to."""
+
+    def __init__(self, audience: str, queue_size: int):
+        self.audience = audience
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def wants(self, target_audience: str) -> bool:
+        return self.audience == "all" or target_audience in ("all", self.audience)
+
+
+class NotificationHub:
+    """In-process pub/sub fan-out of notifications to streaming clients.
+
+    publish() never awaits: a client whose queue is full is dropped instead of
+    slowing everyone else down. It is expected to reconnect and catch up from
+    the database.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscriber] = set()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, audience: str = "all", queue_size: Optional[int] = None) -> Subscriber:
+        subscriber = Subscriber(audience, queue_size or self.queue_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+
+    def publish(self, notification: dict) -> int:
+        self.published += 1
+        delivered = 0
+        for subscriber in list(self.subscribers):
+            if not subscriber.wants(notification["target_audience"]):
+                continue
+            try:
+                subscriber.queue.put_nowait(notification)
+                delivered += 1
+            except asyncio.QueueFull:
+                subscriber.dropped = True
+                self.unsubscribe(subscriber)
+                self.dropped += 1
+        self.delivered += delivered
+        return delivered
+
+    def stats(self) -> Dict[str, int]:
+        audiences: Dict[str, int] = {}
+        for subscriber in self.subscribers:
+            audiences[subscriber.audience] = audiences.get(subscriber.audience, 0) + 1
+        return {
+            "subscribers": len(self.subscribers),
+            "by_audience": audiences,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,29 @@
+"""Rebuild the materialized grade_summaries collection from grades_collection.
+
+Use after a backfill or bulk grade import done outside the API, or to repair
+summaries that drifted because a summary write failed.
+
+    python rebuild_summaries.py
+    python rebuild_summaries.py --student-class "Standard 4" --term "Term 1"
+"""
+import asyncio
+from typing import Optional
+
+import typer
+
+from server import StudentClass, TermEnum, grade_filters, recompute_grade_summaries
+
+app = typer.Typer()
+
+
+@app.command()
+def main(
+    student_class: Optional[StudentClass] = typer.Option(None, help="Only rebuild this class"),
+    term: Optional[TermEnum] = typer.Option(None, help="Only rebuild this term"),
+):
+    groups = asyncio.run(recompute_grade_summaries(grade_filters(None, student_class, term)))
+    typer.echo(f"Rebuilt {groups} class/term summaries")
+
+
+if __name__ == "__main__":
+    app()
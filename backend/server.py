@@ -1,27 +1,158 @@
-from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, EmailStr
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, EmailStr, Field, ValidationError
 from typing import Optional, List, Dict, Any
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, DeleteMany, IndexModel, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 import uuid
 from datetime import datetime, timedelta
 from enum import Enum
 import bcrypt
 from jose import JWTError, jwt
 import asyncio
+from analytics import performance_report, student_report
+from cache import TTLCache
+from change_feed import ChangeFeed
+from compression import PrecompressedStaticFiles, SelectiveGZipMiddleware, build_assets
+from conditional import CollectionVersions, ConditionalGetMiddleware
+from jobs import FINISHED, JobQueue
+from monitoring import CommandMetricsListener, HttpMetrics, MetricsMiddleware, PoolStatsListener, render_counter, render_metrics
+from notification_hub import NotificationHub
+from shared_state import create_state
+import base64
+import codecs
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import hashlib
+import hmac
+import io
+import json
+import logging
+import math
+from pathlib import Path
+import re
+import time
+import zlib
 
 # Environment variables
 MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
+# Connection pool tuning, per worker process. Unset options keep the driver defaults.
+# Compressors are tried in order and need the matching package (zstandard,
+# python-snappy); zlib is built in.
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_CONNECTING = int(os.environ.get("MONGO_MAX_CONNECTING", "2"))
+MONGO_MAX_IDLE_TIME_MS = os.environ.get("MONGO_MAX_IDLE_TIME_MS")
+MONGO_WAIT_QUEUE_TIMEOUT_MS = os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_COMPRESSORS = os.environ.get("MONGO_COMPRESSORS", "")
+MONGO_READ_PREFERENCE = os.environ.get("MONGO_READ_PREFERENCE", "primary")
 CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "*").split(",")
-SECRET_KEY = "bright_academy_secret_key_2024"
+# Signs access tokens and keys the password cache; there is deliberately no default
+SECRET_KEY = os.environ.get("SECRET_KEY", "")
+if not SECRET_KEY:
+    raise RuntimeError("SECRET_KEY is not set; generate one with: python -c 'import secrets; print(secrets.token_urlsafe(32))'")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Static bearer token for the /metrics scraper (Prometheus `authorization`); unset disables /metrics
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_CACHE_TTL_SECONDS = float(os.environ.get("PASSWORD_CACHE_TTL_SECONDS", "300"))
+PASSWORD_CACHE_MAXSIZE = int(os.environ.get("PASSWORD_CACHE_MAXSIZE", "1024"))
+TOKEN_CACHE_MAXSIZE = int(os.environ.get("TOKEN_CACHE_MAXSIZE", "4096"))
+PERMISSION_CACHE_MAXSIZE = int(os.environ.get("PERMISSION_CACHE_MAXSIZE", "1024"))
+PERMISSION_CACHE_TTL_SECONDS = float(os.environ.get("PERMISSION_CACHE_TTL_SECONDS", "300"))
+# Bumped whenever stored student documents change shape; see migrate_students.py
+STUDENT_SCHEMA_VERSION = 1
+STATS_CACHE_TTL_SECONDS = float(os.environ.get("STATS_CACHE_TTL_SECONDS", "60"))
+STATS_CACHE_MAXSIZE = int(os.environ.get("STATS_CACHE_MAXSIZE", "32"))
+BULK_IMPORT_BATCH_SIZE = int(os.environ.get("BULK_IMPORT_BATCH_SIZE", "500"))
+BULK_IMPORT_MAX_ERRORS = int(os.environ.get("BULK_IMPORT_MAX_ERRORS", "1000"))
+BULK_IMPORT_MAX_RECORD_BYTES = int(os.environ.get("BULK_IMPORT_MAX_RECORD_BYTES", "65536"))
+PERFORMANCE_CACHE_TTL_SECONDS = float(os.environ.get("PERFORMANCE_CACHE_TTL_SECONDS", "300"))
+PERFORMANCE_CACHE_MAXSIZE = int(os.environ.get("PERFORMANCE_CACHE_MAXSIZE", "256"))
+NOTIFICATION_QUEUE_SIZE = int(os.environ.get("NOTIFICATION_QUEUE_SIZE", "100"))
+NOTIFICATION_REPLAY_LIMIT = int(os.environ.get("NOTIFICATION_REPLAY_LIMIT", "100"))
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_RETRY_MS = 3000
+UNREAD_CACHE_MAXSIZE = int(os.environ.get("UNREAD_CACHE_MAXSIZE", "4096"))
+UNREAD_CACHE_TTL_SECONDS = float(os.environ.get("UNREAD_CACHE_TTL_SECONDS", "60"))
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_CHUNK_BYTES = 64 * 1024
+BATCH_GET_MAX_IDS = int(os.environ.get("BATCH_GET_MAX_IDS", "500"))
+# The static site (index.html, portal.html, ...) lives only in frontend/public;
+# STATIC_BUILD_DIR receives the hashed, precompressed copy that is actually served
+STATIC_SOURCE_DIR = Path(os.environ.get("STATIC_SOURCE_DIR", Path(__file__).resolve().parent.parent / "frontend" / "public"))
+STATIC_BUILD_DIR = Path(os.environ.get("STATIC_BUILD_DIR", Path(__file__).resolve().parent / "static_build"))
+GZIP_MINIMUM_SIZE = int(os.environ.get("GZIP_MINIMUM_SIZE", "1024"))
+# memory:// keeps caches and counters per process, so it is only correct with one
+# worker; use redis://host:6379/0 (or any Redis-compatible server) with several
+SHARED_STATE_URL = os.environ.get("SHARED_STATE_URL", "memory://")
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+# Change-stream consumer keeping live counters and invalidating caches (see change_feed.py)
+CHANGE_FEED_ENABLED = os.environ.get("CHANGE_FEED_ENABLED", "true").lower() == "true"
+CHANGE_FEED_POLL_SECONDS = float(os.environ.get("CHANGE_FEED_POLL_SECONDS", "5"))
+CHANGE_FEED_SAVE_SECONDS = float(os.environ.get("CHANGE_FEED_SAVE_SECONDS", "5"))
+CHANGE_FEED_PRE_IMAGES = os.environ.get("CHANGE_FEED_PRE_IMAGES", "true").lower() == "true"
+# Background report jobs (see jobs.py): asyncio workers per process, each sharing a process pool
+REPORT_JOB_WORKERS = int(os.environ.get("REPORT_JOB_WORKERS", "2"))
+REPORT_JOB_PROCESSES = int(os.environ.get("REPORT_JOB_PROCESSES", "2"))
+REPORT_JOB_QUEUE_SIZE = int(os.environ.get("REPORT_JOB_QUEUE_SIZE", "100"))
+REPORT_RESULT_DIR = Path(os.environ.get("REPORT_RESULT_DIR", Path(__file__).resolve().parent / "report_results"))
+REPORT_RESULT_TTL_SECONDS = float(os.environ.get("REPORT_RESULT_TTL_SECONDS", "3600"))
 
-app = FastAPI(title="Bright Academy Management System", description="Complete school management system with MongoDB backend")
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if STATIC_SOURCE_DIR.is_dir():
+        await asyncio.to_thread(build_assets, STATIC_SOURCE_DIR, STATIC_BUILD_DIR, GZIP_MINIMUM_SIZE)
+    await ensure_indexes()
+    relay = asyncio.create_task(relay_notifications())
+    feed = asyncio.create_task(change_feed.run()) if CHANGE_FEED_ENABLED else None
+    await report_jobs.start()
+    yield
+    await report_jobs.stop()
+    relay.cancel()
+    if feed:
+        feed.cancel()
+        await asyncio.gather(feed, return_exceptions=True)
+    await shared_state.close()
+    client.close()
+
+app = FastAPI(title="Bright Academy Management System", description="Complete school management system with MongoDB backend", lifespan=lifespan)
+
+# State shared between worker processes (see shared_state.py), then conditional
+# GETs: ETag / Last-Modified from per-collection version counters.
+# Added first so it runs inside CORS and 304s still carry the CORS headers.
+shared_state = create_state(SHARED_STATE_URL)
+collection_versions = CollectionVersions(shared_state)
+app.add_middleware(
+    ConditionalGetMiddleware,
+    versions=collection_versions,
+    reads={
+        "/api/students": ("students",),
+        "/api/teachers": ("teachers",),
+        # Grades carry denormalized student fields
+        "/api/grades": ("grades",),
+        "/api/reports/performance": ("grades",),
+        "/api/reports/summary": ("grades",),
+    },
+    writes={
+        # Student updates rewrite the copies of their fields on grades
+        "/api/students": ("students", "grades"),
+        "/api/teachers": ("teachers",),
+        "/api/grades": ("grades",),
+    },
+    # POSTs that only read
+    exempt={"/api/students/batch-get", "/api/teachers/batch-get"},
+)
 
 # CORS middleware
 app.add_middleware(
@@ -30,16 +161,188 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
+# Compress larger responses on the fly; precompressed static files, event streams
+# and gzip exports pass through untouched
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
+# Request metrics, exposed with the database metrics on /metrics
+http_metrics = HttpMetrics()
+app.add_middleware(MetricsMiddleware, metrics=http_metrics)
+
 # MongoDB connection
-client = AsyncIOMotorClient(MONGO_URL)
+def mongo_client_options() -> dict:
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxConnecting": MONGO_MAX_CONNECTING,
+        "readPreference": MONGO_READ_PREFERENCE,
+    }
+    if MONGO_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = int(MONGO_MAX_IDLE_TIME_MS)
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = int(MONGO_WAIT_QUEUE_TIMEOUT_MS)
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
+
+pool_stats = PoolStatsListener()
+command_metrics = CommandMetricsListener()
+# connect=False: no sockets or monitor threads until the first operation, so the
+# client is safe to create before a pre-fork server forks its workers
+client = AsyncIOMotorClient(MONGO_URL, connect=False, event_listeners=[pool_stats, command_metrics], **mongo_client_options())
 db = client[DB_NAME]
 students_collection = db.students
 teachers_collection = db.teachers
 grades_collection = db.grades
 users_collection = db.users
 notifications_collection = db.notifications
+# Materialized per-(studentClass, term) running totals over grades_collection
+grade_summaries_collection = db.grade_summaries
+# Per-user notification read state: a last-read watermark plus ids read individually after it
+notification_reads_collection = db.notification_reads
+
+# Caches for derived data; mutations invalidate the keys they affect. They live in
+# the shared state backend so an invalidation on one worker is seen by all of them.
+stats_cache = shared_state.cache("student_stats", STATS_CACHE_MAXSIZE, STATS_CACHE_TTL_SECONDS)
+# Keyed by "studentClass|term"; "*" in either position means "all"
+performance_cache = shared_state.cache("performance", PERFORMANCE_CACHE_MAXSIZE, PERFORMANCE_CACHE_TTL_SECONDS)
+# Auth caches: verified passwords (keyed by an HMAC, never the password), decoded
+# tokens (expire with the token) and per-user permissions. These stay per worker:
+# an entry only depends on its key, or expires within minutes.
+password_cache = TTLCache(maxsize=PASSWORD_CACHE_MAXSIZE, ttl=PASSWORD_CACHE_TTL_SECONDS)
+token_cache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+permission_cache = TTLCache(maxsize=PERMISSION_CACHE_MAXSIZE, ttl=PERMISSION_CACHE_TTL_SECONDS)
+# Unread notification badge counts, keyed by user id
+unread_cache = shared_state.cache("unread_notifications", UNREAD_CACHE_MAXSIZE, UNREAD_CACHE_TTL_SECONDS)
+CACHES = {
+    "student_stats": stats_cache,
+    "performance": performance_cache,
+    "passwords": password_cache,
+    "tokens": token_cache,
+    "permissions": permission_cache,
+    "unread_notifications": unread_cache,
+}
+STUDENT_STATS_KEY = "overview"
+STUDENT_STATS_FIELDS = {"studentClass", "gender", "dob"}
+# Student fields denormalized onto their grades
+STUDENT_GRADE_FIELDS = {"firstName", "lastName", "studentClass"}
+
+async def invalidate_performance(*classes: str):
+    # Drop the reports for these classes and every report spanning all classes
+    for student_class in ("*", *classes):
+        await performance_cache.invalidate_prefix(f"{student_class}|")
+
+# Fan-out of new notifications to connected /api/notifications/stream clients.
+# New notifications go out on the shared NOTIFICATION_CHANNEL and every worker
+# relays them to its own hub, so a stream sees notifications created on any worker.
+notification_hub = NotificationHub(queue_size=NOTIFICATION_QUEUE_SIZE)
+NOTIFICATION_CHANNEL = "notifications"
+NOTIFICATION_AUDIENCES = "^(all|students|teachers)$"
+# Audience whose notifications a logged-in user sees; other roles see everything
+ROLE_AUDIENCES = {"teacher": "teachers"}
+NEVER_READ = datetime(1970, 1, 1)
+
+# Changes seen on the change feed, whoever made them, invalidate what is derived
+# from the collection. API writes have already done this; the repeat is cheap.
+FEED_VERSIONS = {"students": ("students",), "teachers": ("teachers",), "grades": ("grades",)}
+
+async def on_collection_change(name: str, documents: List[dict]):
+    if name == "students":
+        await stats_cache.invalidate(STUDENT_STATS_KEY)
+    elif name == "grades":
+        classes = {document.get("studentClass") for document in documents} - {None}
+        if classes:
+            await invalidate_performance(*classes)
+        else:
+            await performance_cache.clear()
+    elif name == "notifications":
+        await unread_cache.clear()
+    if name in FEED_VERSIONS:
+        await collection_versions.bump(FEED_VERSIONS[name])
+
+change_feed = ChangeFeed(
+    db,
+    {
+        # Legacy students only have class_name, read as studentClass like the stats overview does
+        "students": {"studentClass": ["studentClass", "class_name"], "gender": ["gender"]},
+        "teachers": {},
+        "grades": {},
+        "notifications": {},
+    },
+    on_collection_change,
+    poll_seconds=CHANGE_FEED_POLL_SECONDS,
+    save_seconds=CHANGE_FEED_SAVE_SECONDS,
+    pre_images=CHANGE_FEED_PRE_IMAGES,
+)
+
+# Index registry: every collection the API queries, with the indexes its filters rely on.
+# create_indexes is idempotent, so this is safe to run on every startup.
+INDEXES = {
+    students_collection: [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+        IndexModel([("studentClass", ASCENDING)], name="studentClass"),
+        IndexModel([("search_terms", ASCENDING)], name="search_terms"),
+        IndexModel([("updated_at", DESCENDING)], name="updated_at_desc"),
+    ],
+    teachers_collection: [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+        IndexModel([("search_terms", ASCENDING)], name="search_terms"),
+        IndexModel([("updated_at", DESCENDING)], name="updated_at_desc"),
+    ],
+    grades_collection: [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # One grade per student and term: a retried batch cannot count a grade twice
+        IndexModel([("studentId", ASCENDING), ("term", ASCENDING)], name="studentId_term_unique", unique=True),
+        IndexModel([("studentClass", ASCENDING), ("term", ASCENDING)], name="studentClass_term"),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+        IndexModel([("updated_at", DESCENDING)], name="updated_at_desc"),
+    ],
+    users_collection: [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ],
+    grade_summaries_collection: [
+        IndexModel([("studentClass", ASCENDING), ("term", ASCENDING)], name="studentClass_term_unique", unique=True),
+    ],
+    notifications_collection: [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+        IndexModel([("target_audience", ASCENDING), ("created_at", DESCENDING)], name="target_audience_created_at"),
+        IndexModel([("updated_at", DESCENDING)], name="updated_at_desc"),
+    ],
+    notification_reads_collection: [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+}
+
+# Indexes superseded by a unique index on the same keys. They are dropped so the
+# replacement can be built, and put back while old data still violates it.
+RETIRED_INDEXES = {
+    grades_collection: [IndexModel([("studentId", ASCENDING), ("term", ASCENDING)], name="studentId_term")],
+}
+
+async def ensure_indexes():
+    for collection, indexes in INDEXES.items():
+        retired = RETIRED_INDEXES.get(collection, [])
+        try:
+            existing = await collection.index_information()
+            for index in retired:
+                if index.document["name"] in existing:
+                    await collection.drop_index(index.document["name"])
+            await collection.create_indexes(indexes)
+        except PyMongoError as e:
+            # A bad index (e.g. duplicate ids or grades in old data) must not keep the API from starting
+            logger.error("Could not create indexes on %s: %s", collection.name, e)
+            if retired:
+                try:
+                    await collection.create_indexes(retired)
+                except PyMongoError as e:
+                    logger.error("Could not restore retired indexes on %s: %s", collection.name, e)
 
 # Enums
 class Gender(str, Enum):
@@ -189,6 +492,9 @@ class GradeResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=BATCH_GET_MAX_IDS)
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -209,51 +515,723 @@ class NotificationResponse(BaseModel):
     read: bool = False
 
 # Utility functions
+STUDENT_FIELDS = list(StudentResponse.model_fields)
+
+# Student fields the legacy schema stored under another name (or not at all), with the
+# default for documents holding neither. Each field is resolved on its own: the
+# current field, else the legacy one it replaced, else the default, so a legacy
+# document that was partly updated shows its new values. firstName/lastName fall
+# back to the legacy `name` split at the first space, enrollmentDate to the
+# creation date. student_helper and STUDENT_PROJECTION both apply this rule.
+STUDENT_FIELD_SOURCES = {
+    "gender": (None, "Male"),
+    "dob": (None, "2000-01-01"),
+    "studentClass": ("class_name", ""),
+    "parentName": ("parent_name", ""),
+    "relationship": (None, "Parent"),
+    "parentPhone": ("contact_phone", ""),
+    "address": (None, ""),
+    "photo": (None, "https://via.placeholder.com/50"),
+}
+
+def field_value(document: dict, field: Optional[str], default):
+    # Python side of field_or: a missing or null field takes the default
+    value = document.get(field) if field else None
+    return default if value is None else value
+
 def student_helper(student) -> dict:
-    # Handle both old and new data formats
-    if "firstName" in student and "lastName" in student:
-        # New format - data is already in the correct format
-        return {
-            "id": student["id"],
-            "firstName": student.get("firstName", ""),
-            "lastName": student.get("lastName", ""),
-            "gender": student.get("gender", "Male"),
-            "dob": student.get("dob", "2000-01-01"),
-            "studentClass": student.get("studentClass", ""),
-            "enrollmentDate": student.get("enrollmentDate", student["created_at"].strftime("%Y-%m-%d")),
-            "parentName": student.get("parentName", ""),
-            "relationship": student.get("relationship", "Parent"),
-            "parentPhone": student.get("parentPhone", ""),
-            "address": student.get("address", ""),
-            "photo": student.get("photo", "https://via.placeholder.com/50"),
-            "created_at": student["created_at"],
-            "updated_at": student["updated_at"]
-        }
-    else:
-        # Old format - convert from old schema to new schema
-        name_parts = student.get("name", "").split(" ", 1)
-        first_name = name_parts[0] if name_parts else ""
-        last_name = name_parts[1] if len(name_parts) > 1 else ""
-        
+    name_parts = field_value(student, "name", "").split(" ", 1)
+    response = {
+        "id": student["id"],
+        "firstName": field_value(student, "firstName", name_parts[0]),
+        "lastName": field_value(student, "lastName", name_parts[1] if len(name_parts) > 1 else ""),
+    }
+    for field, (legacy, default) in STUDENT_FIELD_SOURCES.items():
+        response[field] = field_value(student, field, field_value(student, legacy, default))
+    response["enrollmentDate"] = field_value(student, "enrollmentDate", student["created_at"].strftime("%Y-%m-%d"))
+    response["created_at"] = student["created_at"]
+    response["updated_at"] = student["updated_at"]
+    return response
+
+# Database-side equivalents of student_helper/teacher_helper for list endpoints.
+# Mongo emits rows already in the response shape, so they can be serialized
+# straight to JSON without a helper pass or a second Pydantic validation.
+def field_or(field: str, default) -> dict:
+    return {"$ifNull": [f"${field}", default]}
+
+LEGACY_NAME = field_or("name", "")
+LEGACY_NAME_SPLIT = {"$indexOfCP": [LEGACY_NAME, " "]}
+CREATED_DATE = {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+
+STUDENT_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "firstName": field_or("firstName", {"$cond": [
+        {"$eq": [LEGACY_NAME_SPLIT, -1]},
+        LEGACY_NAME,
+        {"$substrCP": [LEGACY_NAME, 0, LEGACY_NAME_SPLIT]},
+    ]}),
+    "lastName": field_or("lastName", {"$cond": [
+        {"$eq": [LEGACY_NAME_SPLIT, -1]},
+        "",
+        {"$substrCP": [LEGACY_NAME, {"$add": [LEGACY_NAME_SPLIT, 1]}, {"$strLenCP": LEGACY_NAME}]},
+    ]}),
+    **{
+        field: field_or(field, field_or(legacy, default) if legacy else default)
+        for field, (legacy, default) in STUDENT_FIELD_SOURCES.items()
+    },
+    "enrollmentDate": field_or("enrollmentDate", CREATED_DATE),
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+TEACHER_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "firstName": field_or("firstName", ""),
+    "lastName": field_or("lastName", ""),
+    "gender": field_or("gender", "Male"),
+    "dob": field_or("dob", "2000-01-01"),
+    "email": field_or("email", ""),
+    "phone": field_or("phone", ""),
+    "qualification": field_or("qualification", ""),
+    "hireDate": field_or("hireDate", CREATED_DATE),
+    "subjects": field_or("subjects", ""),
+    "classes": field_or("classes", ""),
+    "address": field_or("address", ""),
+    "photo": field_or("photo", "https://via.placeholder.com/50"),
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+async def projected_page(collection, projection: dict, query: dict, limit: int, skip: int = 0) -> ORJSONResponse:
+    pipeline = [{"$match": query}, {"$sort": {"created_at": 1, "id": 1}}]
+    if skip:
+        pipeline.append({"$skip": skip})
+    pipeline += [{"$limit": limit}, {"$project": projection}]
+    rows = await collection.aggregate(pipeline).to_list(limit)
+    headers = {"X-Next-Cursor": encode_cursor(rows[-1])} if len(rows) == limit else None
+    return ORJSONResponse(rows, headers=headers)
+
+async def batch_get(collection, projection: dict, ids: List[str]) -> ORJSONResponse:
+    # One $in lookup on the unique id index instead of a find_one per id
+    ids = list(dict.fromkeys(ids))
+    rows = await collection.aggregate([{"$match": {"id": {"$in": ids}}}, {"$project": projection}]).to_list(len(ids))
+    results = {row["id"]: row for row in rows}
+    return ORJSONResponse({"results": results, "missing": [key for key in ids if key not in results]})
+
+# Search: each document keeps a `search_terms` array of lowercase words from its
+# name fields plus the digits of its phone number. A multikey index on it turns
+# an anchored prefix regex into an index range scan.
+STUDENT_SEARCH_FIELDS = ["firstName", "lastName", "parentName"]
+TEACHER_SEARCH_FIELDS = ["firstName", "lastName", "email", "subjects"]
+SEARCH_MAX_TERMS = 5
+
+def search_terms(document: dict, fields: List[str], phone_field: str) -> List[str]:
+    terms = set()
+    for field in fields:
+        terms.update(word for word in str(document.get(field) or "").lower().split(" ") if word)
+    digits = re.sub(r"\D", "", document.get(phone_field) or "")
+    if digits:
+        terms.add(digits)
+    return sorted(terms)
+
+def search_terms_stage(fields: List[str], phone_field: str) -> dict:
+    # Update-pipeline equivalent of search_terms, for updates and backfills
+    words = [{"$split": [{"$toLower": field_or(field, "")}, " "]} for field in fields]
+    digits = {"$reduce": {
+        "input": {"$regexFindAll": {"input": field_or(phone_field, ""), "regex": "[0-9]"}},
+        "initialValue": "",
+        "in": {"$concat": ["$$value", "$$this.match"]},
+    }}
+    return {"$set": {"search_terms": {"$filter": {
+        "input": {"$setUnion": words + [[digits]]},
+        "cond": {"$ne": ["$$this", ""]},
+    }}}}
+
+STUDENT_SEARCH_STAGE = search_terms_stage(STUDENT_SEARCH_FIELDS, "parentPhone")
+TEACHER_SEARCH_STAGE = search_terms_stage(TEACHER_SEARCH_FIELDS, "phone")
+STUDENT_SEARCH_UPDATE_FIELDS = {*STUDENT_SEARCH_FIELDS, "parentPhone"}
+TEACHER_SEARCH_UPDATE_FIELDS = {*TEACHER_SEARCH_FIELDS, "phone"}
+
+def search_query_terms(q: str) -> List[str]:
+    # A query that looks like a phone number is matched as one run of digits
+    if re.fullmatch(r"[\d+\-() ]+", q.strip()):
+        digits = re.sub(r"\D", "", q)
+        return [digits] if digits else []
+    return q.lower().split()[:SEARCH_MAX_TERMS]
+
+async def search_page(collection, projection: dict, q: str, limit: int, skip: int) -> ORJSONResponse:
+    terms = search_query_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Empty search query")
+    pipeline = [
+        {"$match": {"search_terms": {"$all": [re.compile(f"^{re.escape(term)}") for term in terms]}}},
+        # Whole-word matches rank above prefix-only matches
+        {"$addFields": {"_score": {"$size": {"$setIntersection": ["$search_terms", terms]}}}},
+        {"$sort": {"_score": -1, "lastName": 1, "firstName": 1, "id": 1}},
+        {"$skip": skip},
+        {"$limit": limit},
+        {"$project": projection},
+    ]
+    return ORJSONResponse(await collection.aggregate(pipeline).to_list(limit))
+
+def teacher_helper(teacher) -> dict:
+    return {
+        "id": teacher["id"],
+        "firstName": teacher.get("firstName", ""),
+        "lastName": teacher.get("lastName", ""),
+        "gender": teacher.get("gender", "Male"),
+        "dob": teacher.get("dob", "2000-01-01"),
+        "email": teacher.get("email", ""),
+        "phone": teacher.get("phone", ""),
+        "qualification": teacher.get("qualification", ""),
+        "hireDate": teacher.get("hireDate", teacher["created_at"].strftime("%Y-%m-%d")),
+        "subjects": teacher.get("subjects", ""),
+        "classes": teacher.get("classes", ""),
+        "address": teacher.get("address", ""),
+        "photo": teacher.get("photo", "https://via.placeholder.com/50"),
+        "created_at": teacher["created_at"],
+        "updated_at": teacher["updated_at"]
+    }
+
+# Grades store their average and letter grade (and the student's name and class)
+# at write time, so reads never join or recompute.
+SUBJECTS = ["english", "chichewa", "math", "science", "socialStudies"]
+GRADE_BOUNDARIES = [(80, "A"), (70, "B"), (60, "C"), (50, "D")]
+GRADE_FIELDS = list(GradeResponse.model_fields)
+# Grade fields that feed the performance reports
+GRADE_REPORT_FIELDS = {*SUBJECTS, "term"}
+GRADE_PROJECTION = {"_id": 0, **{field: 1 for field in GRADE_FIELDS}}
+
+def letter_grade(average: float) -> str:
+    # Same scale as the portal: the average is rounded half-up before banding
+    rounded = math.floor(average + 0.5)
+    for boundary, letter in GRADE_BOUNDARIES:
+        if rounded >= boundary:
+            return letter
+    return "F"
+
+def grade_summary(scores: dict) -> dict:
+    average = round(sum(scores[subject] for subject in SUBJECTS) / len(SUBJECTS), 2)
+    return {"average": average, "grade": letter_grade(average)}
+
+# Update-pipeline equivalent of grade_summary, applied by update_document
+GRADE_SUMMARY_STAGES = [
+    {"$set": {"average": {"$round": [{"$avg": [f"${subject}" for subject in SUBJECTS]}, 2]}}},
+    {"$set": {"grade": {"$switch": {
+        "branches": [
+            {"case": {"$gte": [{"$floor": {"$add": ["$average", 0.5]}}, boundary]}, "then": letter}
+            for boundary, letter in GRADE_BOUNDARIES
+        ],
+        "default": "F",
+    }}}},
+]
+
+def student_denormalized(student) -> dict:
+    # Student fields copied onto grade documents
+    student = student_helper(student)
+    return {
+        "studentName": f"{student['firstName']} {student['lastName']}".strip(),
+        "studentClass": student["studentClass"],
+    }
+
+def new_grade_document(grade: GradeCreate, student) -> dict:
+    document = new_document(grade, **student_denormalized(student))
+    document["term"] = grade.term.value
+    document["comments"] = document["comments"] or ""
+    document.update(grade_summary(document))
+    return document
+
+def grade_helper(grade) -> dict:
+    return {
+        "id": grade["id"],
+        "studentId": grade["studentId"],
+        "studentName": grade.get("studentName", ""),
+        "studentClass": grade.get("studentClass", ""),
+        "term": grade["term"],
+        "english": grade["english"],
+        "chichewa": grade["chichewa"],
+        "math": grade["math"],
+        "science": grade["science"],
+        "socialStudies": grade["socialStudies"],
+        "average": grade["average"],
+        "grade": grade["grade"],
+        "comments": grade.get("comments") or "",
+        "created_at": grade["created_at"],
+        "updated_at": grade["updated_at"]
+    }
+
+# Grade summaries: count plus sum/min/max of every subject and of the average,
+# per (studentClass, term). Every grade write is applied incrementally: inserts
+# with $inc/$min/$max, updates and deletes with a negative $inc of the old
+# values. Only when a removed value was the group's min or max are min/max
+# found again from grades_collection (see recompute_summary_extremes).
+SUMMARY_FIELDS = SUBJECTS + ["average"]
+SUMMARY_SOURCE_PROJECTION = {"_id": 0, "studentClass": 1, "term": 1, **{field: 1 for field in SUMMARY_FIELDS}}
+SUMMARY_RECOMPUTE_ATTEMPTS = 5
+
+def summary_groups(documents: List[dict]) -> Dict[tuple, List[dict]]:
+    groups = {}
+    for document in documents:
+        groups.setdefault((document.get("studentClass"), document.get("term")), []).append(document)
+    return groups
+
+def summary_update(grades: List[dict], sign: int, now: datetime) -> dict:
+    # `version` changes with every write, so a min/max recompute can detect one it raced with
+    increments = {"count": sign * len(grades), "version": 1}
+    for field in SUMMARY_FIELDS:
+        increments[f"{field}.sum"] = sign * sum(grade[field] for grade in grades)
+    update = {"$inc": increments, "$set": {"updated_at": now}}
+    if sign > 0:
+        update["$min"] = {f"{field}.min": min(grade[field] for grade in grades) for field in SUMMARY_FIELDS}
+        update["$max"] = {f"{field}.max": max(grade[field] for grade in grades) for field in SUMMARY_FIELDS}
+    return update
+
+def summary_increments(documents: List[dict]) -> List[UpdateOne]:
+    now = datetime.utcnow()
+    return [
+        UpdateOne({"studentClass": student_class, "term": term}, summary_update(grades, 1, now), upsert=True)
+        for (student_class, term), grades in summary_groups(documents).items()
+    ]
+
+async def recompute_summary_extremes(key: dict) -> None:
+    # $min/$max are idempotent, so an insert the aggregation already saw does no
+    # harm; any write landing between the read and the $set changes `version`
+    # and the recompute is retried
+    group = {"_id": None}
+    for field in SUMMARY_FIELDS:
+        group[f"{field}_min"] = {"$min": f"${field}"}
+        group[f"{field}_max"] = {"$max": f"${field}"}
+    for _ in range(SUMMARY_RECOMPUTE_ATTEMPTS):
+        summary = await grade_summaries_collection.find_one(key, {"_id": 0, "version": 1})
+        if summary is None:
+            return
+        rows = await grades_collection.aggregate([{"$match": key}, {"$group": group}]).to_list(1)
+        if not rows:
+            return
+        extremes = {}
+        for field in SUMMARY_FIELDS:
+            extremes[f"{field}.min"] = rows[0][f"{field}_min"]
+            extremes[f"{field}.max"] = rows[0][f"{field}_max"]
+        result = await grade_summaries_collection.update_one({**key, "version": summary.get("version")}, {"$set": extremes})
+        if result.matched_count:
+            return
+    logger.warning("Gave up recomputing grade summary min/max for %s after %d attempts", key, SUMMARY_RECOMPUTE_ATTEMPTS)
+
+async def remove_from_summaries(documents: List[dict]) -> None:
+    now = datetime.utcnow()
+    for (student_class, term), grades in summary_groups(documents).items():
+        key = {"studentClass": student_class, "term": term}
+        summary = await grade_summaries_collection.find_one_and_update(
+            key, summary_update(grades, -1, now), return_document=ReturnDocument.AFTER
+        )
+        if summary is None:
+            continue
+        if summary["count"] <= 0:
+            # An insert that raced in has raised the count again and keeps the group
+            await grade_summaries_collection.delete_one({**key, "count": {"$lte": 0}})
+        elif any(grade[field] in (summary[field]["min"], summary[field]["max"]) for grade in grades for field in SUMMARY_FIELDS):
+            await recompute_summary_extremes(key)
+
+def summary_pipeline(match: dict) -> list:
+    group = {"_id": {"studentClass": "$studentClass", "term": "$term"}, "count": {"$sum": 1}}
+    project = {"_id": 0, "studentClass": "$_id.studentClass", "term": "$_id.term", "count": 1}
+    for field in SUMMARY_FIELDS:
+        group[f"{field}_sum"] = {"$sum": f"${field}"}
+        group[f"{field}_min"] = {"$min": f"${field}"}
+        group[f"{field}_max"] = {"$max": f"${field}"}
+        project[field] = {"sum": f"${field}_sum", "min": f"${field}_min", "max": f"${field}_max"}
+    return [{"$match": match}, {"$group": group}, {"$project": project}]
+
+async def recompute_grade_summaries(match: dict) -> int:
+    # Rebuild every summary selected by `match` (a filter on studentClass/term) from the grades.
+    # Used by rebuild_summaries.py; grade writes made while it runs can be lost.
+    summaries = await grades_collection.aggregate(summary_pipeline(match)).to_list(None)
+    now = datetime.utcnow()
+    operations = []
+    for summary in summaries:
+        summary["updated_at"] = now
+        operations.append(ReplaceOne(
+            {"studentClass": summary["studentClass"], "term": summary["term"]}, summary, upsert=True
+        ))
+    # Groups that no longer have any grades
+    remaining = [{"studentClass": summary["studentClass"], "term": summary["term"]} for summary in summaries]
+    operations.append(DeleteMany({"$and": [match, {"$nor": remaining}]} if remaining else match))
+    await grade_summaries_collection.bulk_write(operations, ordered=False)
+    return len(summaries)
+
+async def maintain_grade_summaries(inserted: Optional[List[dict]] = None, removed: Optional[List[dict]] = None):
+    # A failed summary write must not fail the grade write; rebuild_summaries.py repairs drift
+    try:
+        if inserted:
+            await grade_summaries_collection.bulk_write(summary_increments(inserted), ordered=False)
+        if removed:
+            await remove_from_summaries(removed)
+    except PyMongoError as e:
+        logger.error("Could not update grade summaries: %s", e)
+
+def summary_helper(summary) -> dict:
+    count = summary["count"]
+    return {
+        "studentClass": summary["studentClass"],
+        "term": summary["term"],
+        "count": count,
+        **{
+            field: {
+                "mean": round(summary[field]["sum"] / count, 2) if count else 0.0,
+                "min": summary[field]["min"],
+                "max": summary[field]["max"],
+            }
+            for field in SUMMARY_FIELDS
+        },
+        "updated_at": summary["updated_at"],
+    }
+
+def new_student_document(student: StudentCreate) -> dict:
+    document = new_document(student, schema_version=STUDENT_SCHEMA_VERSION)
+    document["search_terms"] = search_terms(document, STUDENT_SEARCH_FIELDS, "parentPhone")
+    return document
+
+def new_teacher_document(teacher: TeacherCreate) -> dict:
+    document = new_document(teacher)
+    document["search_terms"] = search_terms(document, TEACHER_SEARCH_FIELDS, "phone")
+    return document
+
+def notification_helper(notification) -> dict:
+    return {
+        "id": notification["id"],
+        "title": notification["title"],
+        "message": notification["message"],
+        "type": notification.get("type", "info"),
+        "target_audience": notification.get("target_audience", "all"),
+        "created_at": notification["created_at"],
+        "read": notification.get("read", False)
+    }
+
+def audience_filter(audience: str) -> dict:
+    # "all" listens to everything; a specific audience also gets notifications for all
+    return {} if audience == "all" else {"target_audience": {"$in": ["all", audience]}}
+
+async def get_read_state(user_id: str) -> dict:
+    state = await notification_reads_collection.find_one({"user_id": user_id}, {"_id": 0})
+    return {"last_read_at": NEVER_READ, "read_ids": [], **(state or {"user_id": user_id})}
+
+def is_read(notification: dict, read_state: dict) -> bool:
+    return notification["created_at"] <= read_state["last_read_at"] or notification["id"] in read_state["read_ids"]
+
+def sse_event(notification: dict) -> str:
+    data = json.dumps(notification_helper(notification), default=json_default)
+    return f"id: {notification['id']}\nevent: notification\ndata: {data}\n\n"
+
+async def notification_events(subscriber, backlog: List[dict]):
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        sent = set()
+        for notification in backlog:
+            sent.add(notification["id"])
+            yield sse_event(notification)
+        # A dropped (too slow) client gets what is already queued, then the stream
+        # ends and the browser reconnects with Last-Event-ID to catch up
+        while not (subscriber.dropped and subscriber.queue.empty()):
+            try:
+                notification = await asyncio.wait_for(subscriber.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if notification["id"] not in sent:
+                yield sse_event(notification)
+    finally:
+        notification_hub.unsubscribe(subscriber)
+
+async def relay_notifications():
+    # Runs for the life of the worker; a lost connection to the backend is retried
+    while True:
+        try:
+            async for notification in shared_state.subscribe(NOTIFICATION_CHANNEL):
+                notification_hub.publish(notification)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Notification relay interrupted, retrying: %s", e)
+            await asyncio.sleep(1)
+
+def new_document(model: BaseModel, **fields) -> dict:
+    # The response is built from this dict after insert_one, so no re-read is needed
+    document = model.dict()
+    now = datetime.utcnow()
+    document["id"] = str(uuid.uuid4())
+    document["created_at"] = now
+    document["updated_at"] = now
+    document.update(fields)
+    return document
+
+async def update_document(
+    collection,
+    document_id: str,
+    update_data: dict,
+    derived: Optional[List[dict]] = None,
+    match: Optional[dict] = None,
+) -> Optional[dict]:
+    # Update and read back in one atomic round trip; returns None if no document matched.
+    # `match` adds conditions, e.g. the values the caller last read (compare-and-swap).
+    update_data["updated_at"] = datetime.utcnow()
+    update = {"$set": update_data}
+    if derived:
+        # Pipeline form, so derived fields are recomputed from the new values in the same write
+        update = [{"$set": {k: {"$literal": v} for k, v in update_data.items()}}] + derived
+    return await collection.find_one_and_update(
+        {**(match or {}), "id": document_id},
+        update,
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+
+def encode_cursor(document) -> str:
+    # Opaque keyset cursor over the (created_at, id) sort key
+    payload = {"created_at": document["created_at"].isoformat(), "id": document["id"]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(payload["created_at"])
         return {
-            "id": student["id"],
-            "firstName": first_name,
-            "lastName": last_name,
-            "gender": student.get("gender", "Male"),
-            "dob": student.get("dob", "2000-01-01"),
-            "studentClass": student.get("class_name", ""),
-            "enrollmentDate": student.get("enrollmentDate", student["created_at"].strftime("%Y-%m-%d")),
-            "parentName": student.get("parent_name", ""),
-            "relationship": student.get("relationship", "Parent"),
-            "parentPhone": student.get("contact_phone", ""),
-            "address": student.get("address", ""),
-            "photo": student.get("photo", "https://via.placeholder.com/50"),
-            "created_at": student["created_at"],
-            "updated_at": student["updated_at"]
+            "$or": [
+                {"created_at": {"$gt": created_at}},
+                {"created_at": created_at, "id": {"$gt": payload["id"]}},
+            ]
         }
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def iter_body_lines(request: Request):
+    # Decode the request body incrementally so an upload is never held in memory whole
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+def parse_csv_record(lines: List[str]) -> Optional[List[str]]:
+    # csv.reader decides where the record ends (a quote only opens a field at its
+    # start, "" is an escaped quote); None means a quoted field is still open
+    ended = False
+
+    def source():
+        nonlocal ended
+        for line in lines:
+            yield line + "\n"
+        ended = True
+
+    values = next(csv.reader(source()), [])
+    return None if ended else values
+
+async def iter_csv_rows(lines):
+    # Yields a dict per record, or a ValueError for a record that cannot be read,
+    # so the caller reports it as a row error instead of losing it
+    header = None
+    pending, pending_bytes, first_line = [], 0, 0
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not pending:
+            if not line.strip():
+                continue
+            first_line = line_number
+        pending.append(line)
+        pending_bytes += len(line) + 1
+        values = parse_csv_record(pending)
+        if values is None:
+            if pending_bytes <= BULK_IMPORT_MAX_RECORD_BYTES:
+                continue
+            pending, pending_bytes = [], 0
+            yield ValueError(
+                f"record starting at line {first_line} is longer than {BULK_IMPORT_MAX_RECORD_BYTES} bytes "
+                f"(unterminated quoted field?); lines {first_line}-{line_number} were skipped"
+            )
+            continue
+        pending, pending_bytes = [], 0
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield dict(zip(header, values))
+    if pending:
+        yield ValueError(f"unterminated quoted field in the record starting at line {first_line}")
+
+async def iter_ndjson_rows(lines):
+    async for line in lines:
+        if line.strip():
+            yield line
+
+def validation_messages(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+async def insert_student_batch(documents: List[dict], row_numbers: List[int]):
+    # Unordered insert: one bad document does not stop the rest of the batch
+    try:
+        result = await students_collection.insert_many(documents, ordered=False)
+        return len(result.inserted_ids), []
+    except BulkWriteError as e:
+        failed = [
+            {"row": row_numbers[write_error["index"]], "errors": [write_error["errmsg"]]}
+            for write_error in e.details["writeErrors"]
+        ]
+        return e.details["nInserted"], failed
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def csv_value(value):
+    if value is None:
+        return ""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+async def stream_export(cursor, helper, fields: List[str], format: str, compress: bool):
+    # Rows are encoded as the cursor yields them and flushed in ~64KB chunks,
+    # so memory stays constant however many documents are exported
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    if format == "csv":
+        writer.writerow(fields)
+    async for document in cursor:
+        row = helper(document)
+        if format == "csv":
+            writer.writerow([csv_value(row.get(field)) for field in fields])
+        else:
+            buffer.write(json.dumps(row, default=json_default))
+            buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            chunk = flush()
+            if chunk:
+                yield chunk
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+def export_response(cursor, helper, fields: List[str], name: str, format: str, compress: bool) -> StreamingResponse:
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"{name}.{format}"
+    if compress:
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        stream_export(cursor, helper, fields, format, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# Authentication
+# bcrypt runs on its own small pool so a login storm cannot block the event loop
+# or starve other thread-pool work
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+bearer_scheme = HTTPBearer(auto_error=False)
 
-# Root endpoint
-@app.get("/")
+ROLE_PERMISSIONS = {
+    "admin": {"students:read", "students:write", "teachers:read", "teachers:write", "grades:read",
+              "grades:write", "reports:read", "notifications:write", "admin"},
+    "teacher": {"students:read", "teachers:read", "grades:read", "grades:write", "reports:read"},
+    "staff": {"students:read", "students:write", "teachers:read", "reports:read"},
+}
+# Compared against when the username does not exist, so both cases cost one bcrypt check
+DUMMY_PASSWORD_HASH = bcrypt.hashpw(b"bright-academy", bcrypt.gensalt()).decode()
+
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    # Keyed on the stored hash too, so a password change never hits a stale entry
+    key = hmac.new(SECRET_KEY.encode(), f"{password_hash}:{password}".encode(), hashlib.sha256).digest()
+    if password_cache.get(key):
+        return True
+    loop = asyncio.get_running_loop()
+    valid = await loop.run_in_executor(password_executor, bcrypt.checkpw, password.encode(), password_hash.encode())
+    if valid:
+        password_cache.set(key, True)
+    return valid
+
+def create_access_token(user: dict) -> str:
+    expires_at = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {"sub": user["id"], "username": user["username"], "role": user.get("role", "staff"), "exp": expires_at}
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_access_token(token: str) -> dict:
+    # Pure CPU: the signed claims are trusted without a database lookup
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+        token_cache.set(token, claims, ttl=claims["exp"] - time.time())
+    elif claims["exp"] <= time.time():
+        raise HTTPException(status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+    return claims
+
+async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> dict:
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return decode_access_token(credentials.credentials)
+
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Optional[dict]:
+    # For public endpoints that personalize their answer: a missing, invalid or
+    # expired token (the portal keeps sending one after it expires) means anonymous
+    if credentials is None:
+        return None
+    try:
+        return decode_access_token(credentials.credentials)
+    except HTTPException:
+        return None
+
+async def get_user_permissions(user: dict) -> set:
+    permissions = permission_cache.get(user["sub"])
+    if permissions is None:
+        stored = await users_collection.find_one({"id": user["sub"]}, {"_id": 0, "role": 1, "permissions": 1})
+        if not stored:
+            raise HTTPException(status_code=401, detail="User no longer exists")
+        permissions = ROLE_PERMISSIONS.get(stored.get("role"), set()) | set(stored.get("permissions", []))
+        permission_cache.set(user["sub"], permissions)
+    return permissions
+
+def require_permission(permission: str):
+    async def dependency(user: dict = Depends(get_current_user)) -> dict:
+        if permission not in await get_user_permissions(user):
+            raise HTTPException(status_code=403, detail="Not permitted")
+        return user
+    return dependency
+
+# Operational endpoints (caches, queues, indexes) are for administrators only
+ADMIN_ONLY = [Depends(require_permission("admin"))]
+
+async def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
+    # A scraper holds no user account, and a static token spares /metrics the permission lookup
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(credentials.credentials.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
+# API banner; the site root serves index.html
+@app.get("/api")
 async def root():
     return {"message": "School Management System API", "status": "running"}
 
@@ -262,12 +1240,253 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "school-management-api"}
 
+# Login
+@app.post("/api/auth/login")
+async def login(credentials: LoginRequest):
+    try:
+        user = await users_collection.find_one(
+            {"username": credentials.username}, {"_id": 0, "id": 1, "username": 1, "role": 1, "password_hash": 1}
+        )
+        valid = await verify_password(credentials.password, user["password_hash"] if user else DUMMY_PASSWORD_HASH)
+        if not user or not valid:
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+        return {
+            "access_token": create_access_token(user),
+            "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            "user": {"id": user["id"], "username": user["username"], "role": user.get("role", "staff")},
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error logging in: {str(e)}")
+
+# Current user
+@app.get("/api/auth/me")
+async def get_me(user: dict = Depends(get_current_user)):
+    return {
+        "id": user["sub"],
+        "username": user["username"],
+        "role": user["role"],
+        "permissions": sorted(await get_user_permissions(user)),
+    }
+
+# Prometheus text exposition of request, database, cache and notification metrics
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    hub = notification_hub.stats()
+    return PlainTextResponse(
+        render_metrics([
+            http_metrics.render(),
+            command_metrics.render(),
+            pool_stats.render(),
+            render_counter("app_cache_hits_total", "Cache hits.", ("cache",), {(name,): cache.hits for name, cache in CACHES.items()}),
+            render_counter("app_cache_misses_total", "Cache misses.", ("cache",), {(name,): cache.misses for name, cache in CACHES.items()}),
+            render_counter("app_notification_subscribers", "Connected notification streams.", (), {(): hub["subscribers"]}, "gauge"),
+            render_counter("app_notifications_dropped_total", "Streams dropped for falling behind.", (), {(): hub["dropped"]}),
+        ]),
+        media_type="text/plain; version=0.0.4",
+    )
+
+# Health check that round-trips to the database and reports pool usage
+@app.get("/api/health/db")
+async def database_health_check():
+    started = time.perf_counter()
+    try:
+        await db.command("ping")
+    except PyMongoError as e:
+        return ORJSONResponse(
+            {"status": "unhealthy", "database": "unreachable", "error": str(e), "pool": pool_stats.stats()},
+            status_code=503,
+        )
+    return {
+        "status": "healthy",
+        "database": "reachable",
+        "ping_ms": round((time.perf_counter() - started) * 1000, 3),
+        "pool": pool_stats.stats(),
+        "options": mongo_client_options(),
+    }
+
+# Index usage report, to spot collections queried without a supporting index
+@app.get("/api/admin/indexes", dependencies=ADMIN_ONLY)
+async def get_index_stats():
+    try:
+        report = {}
+        for collection in INDEXES:
+            stats = await collection.aggregate([{"$indexStats": {}}]).to_list(None)
+            report[collection.name] = [
+                {
+                    "name": stat["name"],
+                    "key": stat["key"],
+                    "ops": stat["accesses"]["ops"],
+                    "since": stat["accesses"]["since"],
+                }
+                for stat in stats
+            ]
+        return report
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching index stats: {str(e)}")
+
+# Cache hit/miss counters and collection versions
+@app.get("/api/admin/cache", dependencies=ADMIN_ONLY)
+async def get_cache_stats():
+    return {
+        **{name: cache.stats() for name, cache in CACHES.items()},
+        "collection_versions": await collection_versions.stats(["students", "teachers", "grades"]),
+    }
+
+# Bulk import students from a streamed CSV or NDJSON upload
+@app.post("/api/students/bulk")
+async def bulk_import_students(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000),
+):
+    content_type = request.headers.get("content-type", "")
+    if format is None:
+        if "csv" in content_type:
+            format = "csv"
+        elif "json" in content_type:
+            format = "ndjson"
+        else:
+            raise HTTPException(status_code=415, detail="Upload must be CSV or NDJSON")
+    batch_size = batch_size or BULK_IMPORT_BATCH_SIZE
+
+    started = time.perf_counter()
+    rows = inserted = failed = batches = 0
+    errors = []
+    documents, row_numbers = [], []
+    pending_write = None
+
+    def record_failures(failures):
+        nonlocal failed
+        failed += len(failures)
+        errors.extend(failures[:max(BULK_IMPORT_MAX_ERRORS - len(errors), 0)])
+
+    async def wait_for_pending():
+        nonlocal inserted, pending_write
+        if pending_write is not None:
+            count, failures = await pending_write
+            pending_write = None
+            inserted += count
+            record_failures(failures)
+
+    try:
+        lines = iter_body_lines(request)
+        records = iter_csv_rows(lines) if format == "csv" else iter_ndjson_rows(lines)
+        async for record in records:
+            rows += 1
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                row = json.loads(record) if format == "ndjson" else record
+                data = {k: v for k, v in row.items() if v not in ("", None)}
+                documents.append(new_student_document(StudentCreate(**data)))
+                row_numbers.append(rows)
+            except ValidationError as e:
+                record_failures([{"row": rows, "errors": validation_messages(e)}])
+            except (ValueError, AttributeError) as e:
+                record_failures([{"row": rows, "errors": [f"Unreadable row: {str(e)}"]}])
+
+            if len(documents) >= batch_size:
+                # At most one batch is in flight: parsing the next batch overlaps the
+                # current write, and the upload is not read further until it completes
+                await wait_for_pending()
+                pending_write = asyncio.ensure_future(insert_student_batch(documents, row_numbers))
+                batches += 1
+                documents, row_numbers = [], []
+
+        await wait_for_pending()
+        if documents:
+            count, failures = await insert_student_batch(documents, row_numbers)
+            inserted += count
+            record_failures(failures)
+            batches += 1
+    except Exception as e:
+        if pending_write is not None and not pending_write.done():
+            pending_write.cancel()
+        raise HTTPException(status_code=500, detail=f"Error importing students: {str(e)}")
+    finally:
+        if inserted:
+            await stats_cache.invalidate(STUDENT_STATS_KEY)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "format": format,
+        "rows": rows,
+        "inserted": inserted,
+        "failed": failed,
+        "batches": batches,
+        "batch_size": batch_size,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
+
+# Notification stream connection counters
+@app.get("/api/admin/notification-hub", dependencies=ADMIN_ONLY)
+async def get_notification_hub_stats():
+    return notification_hub.stats()
+
+# Report job queue counters
+@app.get("/api/admin/jobs", dependencies=ADMIN_ONLY)
+async def get_job_stats():
+    return report_jobs.stats()
+
+# Change feed mode, event counts and live counters
+@app.get("/api/admin/change-feed", dependencies=ADMIN_ONLY)
+async def get_change_feed_stats():
+    return change_feed.snapshot()
+
 # Get all students
 @app.get("/api/students", response_model=List[StudentResponse])
-async def get_students(skip: int = 0, limit: int = 100):
+async def get_students(
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+):
     try:
-        students = await students_collection.find().skip(skip).limit(limit).to_list(limit)
-        return [student_helper(student) for student in students]
+        # Keyset pagination: every page is an index range scan on (created_at, id).
+        # `skip` is kept only for legacy clients and still walks the skipped documents.
+        query = decode_cursor(cursor) if cursor else {}
+        return await projected_page(students_collection, STUDENT_PROJECTION, query, limit, 0 if cursor else skip)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching students: {str(e)}")
+
+# Search students by name, parent name or parent phone (prefix match, ranked)
+@app.get("/api/students/search", response_model=List[StudentResponse])
+async def search_students(
+    q: str = Query(..., min_length=1, max_length=100),
+    skip: int = Query(0, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+):
+    try:
+        return await search_page(students_collection, STUDENT_PROJECTION, q, limit, skip)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching students: {str(e)}")
+
+# Export all students as a streamed NDJSON or CSV download
+@app.get("/api/students/export")
+async def export_students(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    studentClass: Optional[StudentClass] = None,
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000),
+):
+    query = {"studentClass": studentClass.value} if studentClass else {}
+    cursor = students_collection.find(query, {"_id": 0}).sort([("created_at", 1), ("id", 1)]).batch_size(batch_size)
+    return export_response(cursor, student_helper, STUDENT_FIELDS, "students", format, gzip)
+
+# Get many students by ID in one request
+@app.post("/api/students/batch-get")
+async def batch_get_students(request: BatchGetRequest):
+    try:
+        return await batch_get(students_collection, STUDENT_PROJECTION, request.ids)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching students: {str(e)}")
 
@@ -288,18 +1507,10 @@ async def get_student(student_id: str):
 @app.post("/api/students", response_model=StudentResponse)
 async def create_student(student: StudentCreate):
     try:
-        student_dict = student.dict()
-        student_dict["id"] = str(uuid.uuid4())
-        student_dict["created_at"] = datetime.utcnow()
-        student_dict["updated_at"] = datetime.utcnow()
-        
-        result = await students_collection.insert_one(student_dict)
-        if result.inserted_id:
-            new_student = await students_collection.find_one({"id": student_dict["id"]})
-            return student_helper(new_student)
-        raise HTTPException(status_code=500, detail="Failed to create student")
-    except HTTPException:
-        raise
+        student_dict = new_student_document(student)
+        await students_collection.insert_one(student_dict)
+        await stats_cache.invalidate(STUDENT_STATS_KEY)
+        return student_helper(student_dict)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating student: {str(e)}")
 
@@ -307,29 +1518,40 @@ async def create_student(student: StudentCreate):
 @app.put("/api/students/{student_id}", response_model=StudentResponse)
 async def update_student(student_id: str, student_update: StudentUpdate):
     try:
-        # Check if student exists
-        existing_student = await students_collection.find_one({"id": student_id})
-        if not existing_student:
-            raise HTTPException(status_code=404, detail="Student not found")
-        
-        # Prepare update data
         update_data = {k: v for k, v in student_update.dict().items() if v is not None}
         if not update_data:
             raise HTTPException(status_code=400, detail="No valid fields to update")
         
-        update_data["updated_at"] = datetime.utcnow()
-        
-        # Update student
-        result = await students_collection.update_one(
-            {"id": student_id},
-            {"$set": update_data}
-        )
-        
-        if result.modified_count:
-            updated_student = await students_collection.find_one({"id": student_id})
-            return student_helper(updated_student)
+        derived = [STUDENT_SEARCH_STAGE] if STUDENT_SEARCH_UPDATE_FIELDS & update_data.keys() else None
+        updated_student = await update_document(students_collection, student_id, update_data, derived=derived)
+        if not updated_student:
+            raise HTTPException(status_code=404, detail="Student not found")
         
-        raise HTTPException(status_code=500, detail="Failed to update student")
+        if STUDENT_STATS_FIELDS & update_data.keys():
+            await stats_cache.invalidate(STUDENT_STATS_KEY)
+        if STUDENT_GRADE_FIELDS & update_data.keys():
+            # Legacy documents may only have class_name; read the class the way responses do
+            denormalized = student_denormalized(updated_student)
+            if "studentClass" in update_data:
+                # ...unless it was just set: the grades follow the class the update wrote
+                denormalized["studentClass"] = update_data["studentClass"].value
+            new_class = denormalized["studentClass"]
+            query = {"studentId": student_id}
+            moved = []
+            if "studentClass" in update_data:
+                # The grades still carry the class they are moving out of. Only these are
+                # moved, so the summaries are adjusted for exactly the grades that moved.
+                moved = await grades_collection.find(
+                    {"studentId": student_id, "studentClass": {"$ne": new_class}}, {**SUMMARY_SOURCE_PROJECTION, "id": 1}
+                ).to_list(None)
+                query["$or"] = [{"id": {"$in": [grade["id"] for grade in moved]}}, {"studentClass": new_class}]
+            await grades_collection.update_many(query, {"$set": denormalized})
+            await invalidate_performance(new_class, *{grade["studentClass"] for grade in moved})
+            if moved:
+                await maintain_grade_summaries(
+                    inserted=[{**grade, "studentClass": new_class} for grade in moved], removed=moved
+                )
+        return student_helper(updated_student)
     except HTTPException:
         raise
     except Exception as e:
@@ -341,6 +1563,7 @@ async def delete_student(student_id: str):
     try:
         result = await students_collection.delete_one({"id": student_id})
         if result.deleted_count:
+            await stats_cache.invalidate(STUDENT_STATS_KEY)
             return {"message": "Student deleted successfully", "student_id": student_id}
         raise HTTPException(status_code=404, detail="Student not found")
     except HTTPException:
@@ -349,33 +1572,650 @@ async def delete_student(student_id: str):
         raise HTTPException(status_code=500, detail=f"Error deleting student: {str(e)}")
 
 # Get student statistics
+MS_PER_YEAR = 365.25 * 24 * 60 * 60 * 1000
+
+def student_stats_pipeline(now: datetime) -> list:
+    # One pass over the collection: normalize legacy fields, then fan out with $facet
+    return [
+        {"$project": {
+            "_id": 0,
+            "gender": 1,
+            "age": 1,
+            "studentClass": {"$ifNull": ["$studentClass", "$class_name"]},
+            "dobDate": {"$dateFromString": {"dateString": "$dob", "onError": None, "onNull": None}},
+        }},
+        {"$addFields": {
+            "age": {"$cond": [
+                {"$eq": ["$dobDate", None]},
+                "$age",
+                {"$toInt": {"$floor": {"$divide": [{"$subtract": [now, "$dobDate"]}, MS_PER_YEAR]}}},
+            ]},
+        }},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "class_distribution": [
+                {"$group": {"_id": "$studentClass", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}},
+            ],
+            "age_distribution": [
+                {"$match": {"age": {"$ne": None}}},
+                {"$group": {"_id": "$age", "count": {"$sum": 1}}},
+                {"$sort": {"_id": 1}},
+            ],
+            "gender_distribution": [
+                {"$group": {"_id": "$gender", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}},
+            ],
+        }},
+    ]
+
 @app.get("/api/students/stats/overview")
 async def get_student_stats():
+    cached = await stats_cache.get(STUDENT_STATS_KEY)
+    if cached is not None:
+        return cached
     try:
-        total_students = await students_collection.count_documents({})
-        
-        # Get class distribution
-        pipeline = [
-            {"$group": {"_id": "$class_name", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        class_distribution = await students_collection.aggregate(pipeline).to_list(None)
+        result = await students_collection.aggregate(student_stats_pipeline(datetime.utcnow())).to_list(1)
+        facets = result[0]
+        total = facets["total"]
+        stats = {
+            "total_students": total[0]["count"] if total else 0,
+            "class_distribution": facets["class_distribution"],
+            "age_distribution": facets["age_distribution"],
+            "gender_distribution": facets["gender_distribution"],
+        }
+        await stats_cache.set(STUDENT_STATS_KEY, stats)
+        return stats
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching statistics: {str(e)}")
+
+# Dashboard counters, served from the change feed's live counters without touching the database.
+# While the feed is disabled, starting or retrying they are counted directly instead.
+ECD_CLASSES = {StudentClass.play_group.value, StudentClass.pp1.value, StudentClass.pp2.value, StudentClass.ecd.value}
+
+@app.get("/api/statistics/dashboard")
+async def get_dashboard_statistics():
+    if change_feed.ready:
+        counters, source, updated_at = change_feed.counters, change_feed.mode, change_feed.updated_at
+    else:
+        try:
+            names = list(change_feed.counters)
+            counters = dict(zip(names, await asyncio.gather(*(change_feed.count(name) for name in names))))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching dashboard statistics: {str(e)}")
+        source, updated_at = "database", datetime.utcnow()
+    students = counters["students"]
+    classes = students.by_field["studentClass"]
+    genders = students.by_field["gender"]
+    ecd = sum(count for student_class, count in classes.items() if student_class in ECD_CLASSES)
+    return {
+        "totalStudents": students.total,
+        "maleStudents": genders.get(Gender.male.value, 0),
+        "femaleStudents": genders.get(Gender.female.value, 0),
+        "totalTeachers": counters["teachers"].total,
+        "totalGrades": counters["grades"].total,
+        "totalNotifications": counters["notifications"].total,
+        "phaseDistribution": {"ecd": ecd, "primary": students.total - ecd},
+        "classDistribution": classes,
+        "source": source,
+        "updatedAt": updated_at,
+    }
+
+# Get all teachers
+@app.get("/api/teachers", response_model=List[TeacherResponse])
+async def get_teachers(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    try:
+        query = decode_cursor(cursor) if cursor else {}
+        return await projected_page(teachers_collection, TEACHER_PROJECTION, query, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching teachers: {str(e)}")
+
+# Search teachers by name, email, subjects or phone (prefix match, ranked)
+@app.get("/api/teachers/search", response_model=List[TeacherResponse])
+async def search_teachers(
+    q: str = Query(..., min_length=1, max_length=100),
+    skip: int = Query(0, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+):
+    try:
+        return await search_page(teachers_collection, TEACHER_PROJECTION, q, limit, skip)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching teachers: {str(e)}")
+
+# Get many teachers by ID in one request
+@app.post("/api/teachers/batch-get")
+async def batch_get_teachers(request: BatchGetRequest):
+    try:
+        return await batch_get(teachers_collection, TEACHER_PROJECTION, request.ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching teachers: {str(e)}")
+
+# Get teacher by ID
+@app.get("/api/teachers/{teacher_id}", response_model=TeacherResponse)
+async def get_teacher(teacher_id: str):
+    try:
+        teacher = await teachers_collection.find_one({"id": teacher_id})
+        if teacher:
+            return teacher_helper(teacher)
+        raise HTTPException(status_code=404, detail="Teacher not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching teacher: {str(e)}")
+
+# Create new teacher
+@app.post("/api/teachers", response_model=TeacherResponse)
+async def create_teacher(teacher: TeacherCreate):
+    try:
+        teacher_dict = new_teacher_document(teacher)
+        await teachers_collection.insert_one(teacher_dict)
+        return teacher_helper(teacher_dict)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating teacher: {str(e)}")
+
+# Update teacher
+@app.put("/api/teachers/{teacher_id}", response_model=TeacherResponse)
+async def update_teacher(teacher_id: str, teacher_update: TeacherUpdate):
+    try:
+        update_data = {k: v for k, v in teacher_update.dict().items() if v is not None}
+        if not update_data:
+            raise HTTPException(status_code=400, detail="No valid fields to update")
         
-        # Get age distribution
-        age_pipeline = [
-            {"$group": {"_id": "$age", "count": {"$sum": 1}}},
-            {"$sort": {"_id": 1}}
-        ]
-        age_distribution = await students_collection.aggregate(age_pipeline).to_list(None)
+        derived = [TEACHER_SEARCH_STAGE] if TEACHER_SEARCH_UPDATE_FIELDS & update_data.keys() else None
+        updated_teacher = await update_document(teachers_collection, teacher_id, update_data, derived=derived)
+        if not updated_teacher:
+            raise HTTPException(status_code=404, detail="Teacher not found")
+        return teacher_helper(updated_teacher)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating teacher: {str(e)}")
+
+# Delete teacher
+@app.delete("/api/teachers/{teacher_id}")
+async def delete_teacher(teacher_id: str):
+    try:
+        result = await teachers_collection.delete_one({"id": teacher_id})
+        if result.deleted_count:
+            return {"message": "Teacher deleted successfully", "teacher_id": teacher_id}
+        raise HTTPException(status_code=404, detail="Teacher not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting teacher: {str(e)}")
+
+def grade_filters(studentId: Optional[str], studentClass: Optional[StudentClass], term: Optional[TermEnum]) -> dict:
+    query = {}
+    if studentId:
+        query["studentId"] = studentId
+    if studentClass:
+        query["studentClass"] = studentClass.value
+    if term:
+        query["term"] = term.value
+    return query
+
+# Get all grades
+@app.get("/api/grades", response_model=List[GradeResponse])
+async def get_grades(
+    studentId: Optional[str] = None,
+    studentClass: Optional[StudentClass] = None,
+    term: Optional[TermEnum] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    try:
+        query = grade_filters(studentId, studentClass, term)
+        if cursor:
+            query.update(decode_cursor(cursor))
+        return await projected_page(grades_collection, GRADE_PROJECTION, query, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching grades: {str(e)}")
+
+# Export grades as a streamed NDJSON or CSV download
+@app.get("/api/grades/export")
+async def export_grades(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    gzip: bool = False,
+    studentClass: Optional[StudentClass] = None,
+    term: Optional[TermEnum] = None,
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000),
+):
+    query = grade_filters(None, studentClass, term)
+    cursor = grades_collection.find(query, {"_id": 0}).sort([("created_at", 1)]).batch_size(batch_size)
+    return export_response(cursor, grade_helper, GRADE_FIELDS, "grades", format, gzip)
+
+# Get grade by ID
+@app.get("/api/grades/{grade_id}", response_model=GradeResponse)
+async def get_grade(grade_id: str):
+    try:
+        grade = await grades_collection.find_one({"id": grade_id})
+        if grade:
+            return grade_helper(grade)
+        raise HTTPException(status_code=404, detail="Grade not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching grade: {str(e)}")
+
+DUPLICATE_GRADE = "The student already has a grade for this term"
+
+# Create new grade
+@app.post("/api/grades", response_model=GradeResponse)
+async def create_grade(grade: GradeCreate):
+    try:
+        student = await students_collection.find_one({"id": grade.studentId})
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
         
+        grade_dict = new_grade_document(grade, student)
+        try:
+            await grades_collection.insert_one(grade_dict)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=409, detail=DUPLICATE_GRADE)
+        await maintain_grade_summaries(inserted=[grade_dict])
+        await invalidate_performance(grade_dict["studentClass"])
+        return grade_helper(grade_dict)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating grade: {str(e)}")
+
+# Create grades for many students (e.g. a whole class) in one request
+@app.post("/api/grades/batch")
+async def create_grades_batch(grades: List[GradeCreate]):
+    if not grades:
+        raise HTTPException(status_code=400, detail="No grades to create")
+    try:
+        student_ids = list({grade.studentId for grade in grades})
+        students = await students_collection.find({"id": {"$in": student_ids}}).to_list(len(student_ids))
+        students_by_id = {student["id"]: student for student in students}
+
+        documents, indexes, errors = [], [], []
+        for index, grade in enumerate(grades):
+            student = students_by_id.get(grade.studentId)
+            if student:
+                documents.append(new_grade_document(grade, student))
+                indexes.append(index)
+            else:
+                errors.append({"index": index, "studentId": grade.studentId, "error": "Student not found"})
+
+        if documents:
+            try:
+                await grades_collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: everything but the failed rows is inserted, e.g. on a retried batch
+                failed = {}
+                for write_error in e.details["writeErrors"]:
+                    failed[write_error["index"]] = DUPLICATE_GRADE if write_error["code"] == 11000 else write_error["errmsg"]
+                errors.extend(
+                    {"index": indexes[position], "studentId": documents[position]["studentId"], "error": error}
+                    for position, error in failed.items()
+                )
+                errors.sort(key=lambda error: error["index"])
+                documents = [document for position, document in enumerate(documents) if position not in failed]
+        if documents:
+            await maintain_grade_summaries(inserted=documents)
+            await invalidate_performance(*{document["studentClass"] for document in documents})
         return {
-            "total_students": total_students,
-            "class_distribution": class_distribution,
-            "age_distribution": age_distribution
+            "created": [grade_helper(document) for document in documents],
+            "errors": errors,
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching statistics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error creating grades: {str(e)}")
+
+# Update grade
+@app.put("/api/grades/{grade_id}", response_model=GradeResponse)
+async def update_grade(grade_id: str, grade_update: GradeUpdate):
+    try:
+        update_data = {k: v for k, v in grade_update.dict().items() if v is not None}
+        if not update_data:
+            raise HTTPException(status_code=400, detail="No valid fields to update")
+        
+        if not GRADE_REPORT_FIELDS & update_data.keys():
+            updated_grade = await update_document(grades_collection, grade_id, update_data, derived=GRADE_SUMMARY_STAGES)
+            if not updated_grade:
+                raise HTTPException(status_code=404, detail="Grade not found")
+            return grade_helper(updated_grade)
+
+        # Only update the values just read, so the summaries move by the exact difference
+        while True:
+            previous = await grades_collection.find_one({"id": grade_id}, SUMMARY_SOURCE_PROJECTION)
+            if not previous:
+                raise HTTPException(status_code=404, detail="Grade not found")
+            try:
+                updated_grade = await update_document(
+                    grades_collection, grade_id, update_data, derived=GRADE_SUMMARY_STAGES, match=previous
+                )
+            except DuplicateKeyError:
+                raise HTTPException(status_code=409, detail=DUPLICATE_GRADE)
+            if updated_grade:
+                break
+        await maintain_grade_summaries(inserted=[updated_grade], removed=[previous])
+        await invalidate_performance(updated_grade["studentClass"])
+        return grade_helper(updated_grade)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating grade: {str(e)}")
+
+# Delete grade
+@app.delete("/api/grades/{grade_id}")
+async def delete_grade(grade_id: str):
+    try:
+        deleted = await grades_collection.find_one_and_delete({"id": grade_id}, projection=SUMMARY_SOURCE_PROJECTION)
+        if deleted:
+            await maintain_grade_summaries(removed=[deleted])
+            await invalidate_performance(deleted.get("studentClass"))
+            return {"message": "Grade deleted successfully", "grade_id": grade_id}
+        raise HTTPException(status_code=404, detail="Grade not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting grade: {str(e)}")
+
+PERFORMANCE_PROJECTION = {
+    "_id": 0, "studentId": 1, "studentName": 1, "studentClass": 1, "term": 1, "average": 1, "grade": 1,
+    **{subject: 1 for subject in SUBJECTS},
+}
+
+# Background report jobs: rows are loaded here, the report is computed in the process pool
+async def load_rows(job, cursor, total: int, start: float, end: float, label: str) -> List[dict]:
+    rows = []
+    async for row in cursor:
+        rows.append(row)
+        if len(rows) % EXPORT_BATCH_SIZE == 0:
+            job.report(min(start + (end - start) * len(rows) / max(total, 1), end), f"Loaded {len(rows)} of {total} {label}")
+    job.report(end, f"Loaded {len(rows)} {label}")
+    return rows
+
+async def run_performance_report(job) -> dict:
+    query = job.params
+    total = await grades_collection.count_documents(query)
+    cursor = grades_collection.find(query, PERFORMANCE_PROJECTION).batch_size(EXPORT_BATCH_SIZE)
+    rows = await load_rows(job, cursor, total, 0.0, 0.5, "grades")
+    job.report(0.5, "Ranking students")
+    return {"groups": await report_jobs.run_in_process(performance_report, rows, SUBJECTS)}
+
+async def run_student_report(job) -> dict:
+    query = job.params
+    total = await students_collection.count_documents(query)
+    cursor = students_collection.aggregate([{"$match": query}, {"$project": STUDENT_PROJECTION}])
+    students = await load_rows(job, cursor, total, 0.0, 0.3, "students")
+    total = await grades_collection.count_documents(query)
+    cursor = grades_collection.find(query, {"_id": 0, "studentId": 1, "term": 1, "average": 1}).batch_size(EXPORT_BATCH_SIZE)
+    grades = await load_rows(job, cursor, total, 0.3, 0.6, "grades")
+    job.report(0.6, "Building rosters")
+    return {"classes": await report_jobs.run_in_process(student_report, students, grades)}
+
+report_jobs = JobQueue(
+    REPORT_RESULT_DIR,
+    {"performance": run_performance_report, "students": run_student_report},
+    workers=REPORT_JOB_WORKERS,
+    processes=REPORT_JOB_PROCESSES,
+    queue_size=REPORT_JOB_QUEUE_SIZE,
+    result_ttl=REPORT_RESULT_TTL_SECONDS,
+)
+
+def job_helper(job: dict) -> dict:
+    links = {"events_url": f"/api/reports/jobs/{job['id']}/events"}
+    if job["status"] == "done":
+        links["result_url"] = f"/api/reports/jobs/{job['id']}/result"
+    return {**job, **links}
+
+def submit_report_job(kind: str, params: dict) -> dict:
+    try:
+        job, deduplicated = report_jobs.submit(kind, {key: value for key, value in params.items() if value is not None})
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Report queue is full", headers={"Retry-After": "30"})
+    return {**job_helper(job.to_dict()), "deduplicated": deduplicated}
+
+async def job_events(job_id: str):
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    version = None
+    last_sent = time.monotonic()
+    while True:
+        job = report_jobs.get(job_id)
+        if job is None:
+            yield "event: expired\ndata: {}\n\n"
+            return
+        if job["version"] != version:
+            version = job["version"]
+            last_sent = time.monotonic()
+            yield f"event: progress\ndata: {json.dumps(job_helper(job))}\n\n"
+            if job["status"] in FINISHED:
+                return
+        elif time.monotonic() - last_sent >= SSE_HEARTBEAT_SECONDS:
+            last_sent = time.monotonic()
+            yield ": heartbeat\n\n"
+        await report_jobs.wait(job_id, SSE_HEARTBEAT_SECONDS)
+
+# Class performance report: rankings, percentiles and subject statistics per (class, term)
+@app.get("/api/reports/performance")
+async def get_performance_report(
+    studentClass: Optional[StudentClass] = None,
+    term: Optional[TermEnum] = None,
+):
+    key = f"{studentClass.value if studentClass else '*'}|{term.value if term else '*'}"
+    cached = await performance_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        rows = await grades_collection.find(grade_filters(None, studentClass, term), PERFORMANCE_PROJECTION).to_list(None)
+        report = {"groups": await asyncio.to_thread(performance_report, rows, SUBJECTS)}
+        await performance_cache.set(key, report)
+        return report
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building performance report: {str(e)}")
+
+# Queue the performance report as a background job; an identical pending job is reused
+@app.post("/api/reports/performance", status_code=202)
+async def queue_performance_report(
+    studentClass: Optional[StudentClass] = None,
+    term: Optional[TermEnum] = None,
+):
+    return submit_report_job("performance", {
+        "studentClass": studentClass.value if studentClass else None,
+        "term": term.value if term else None,
+    })
+
+# Queue class rosters with term averages and ranks as a background job
+@app.post("/api/reports/students", status_code=202)
+async def queue_student_report(studentClass: Optional[StudentClass] = None):
+    return submit_report_job("students", {"studentClass": studentClass.value if studentClass else None})
+
+# Report job status and progress
+@app.get("/api/reports/jobs/{job_id}")
+async def get_report_job(job_id: str):
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_helper(job)
+
+# Finished report, served from disk
+@app.get("/api/reports/jobs/{job_id}/result")
+async def get_report_job_result(job_id: str):
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    path = report_jobs.result_path(job_id)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Job result expired")
+    return FileResponse(path, media_type="application/json")
+
+# Live job progress (Server-Sent Events); the stream ends when the job finishes
+@app.get("/api/reports/jobs/{job_id}/events")
+async def stream_report_job(job_id: str):
+    if report_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Get notifications, newest first. With a valid bearer token, `read` reflects that user's read state.
+@app.get("/api/notifications", response_model=List[NotificationResponse])
+async def get_notifications(
+    audience: str = Query("all", pattern=NOTIFICATION_AUDIENCES),
+    limit: int = Query(50, ge=1, le=500),
+    user: Optional[dict] = Depends(get_optional_user),
+):
+    try:
+        notifications = await notifications_collection.find(
+            audience_filter(audience), {"_id": 0}
+        ).sort("created_at", -1).limit(limit).to_list(limit)
+        results = [notification_helper(notification) for notification in notifications]
+        if user:
+            read_state = await get_read_state(user["sub"])
+            for result in results:
+                result["read"] = is_read(result, read_state)
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching notifications: {str(e)}")
+
+# Unread notification count for the badge
+@app.get("/api/notifications/unread-count")
+async def get_unread_count(user: dict = Depends(get_current_user)):
+    unread = await unread_cache.get(user["sub"])
+    if unread is not None:
+        return {"unread": unread}
+    try:
+        read_state = await get_read_state(user["sub"])
+        # Only notifications newer than the watermark are counted, using the
+        # (target_audience, created_at) index
+        query = {
+            **audience_filter(ROLE_AUDIENCES.get(user["role"], "all")),
+            "created_at": {"$gt": read_state["last_read_at"]},
+        }
+        if read_state["read_ids"]:
+            query["id"] = {"$nin": read_state["read_ids"]}
+        unread = await notifications_collection.count_documents(query)
+        await unread_cache.set(user["sub"], unread)
+        return {"unread": unread}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error counting notifications: {str(e)}")
+
+# Mark every notification read: moves the watermark and drops the exceptions in one write
+@app.post("/api/notifications/mark-all-read")
+async def mark_all_notifications_read(user: dict = Depends(get_current_user)):
+    try:
+        await notification_reads_collection.update_one(
+            {"user_id": user["sub"]},
+            {"$set": {"last_read_at": datetime.utcnow(), "read_ids": []}},
+            upsert=True,
+        )
+        await unread_cache.set(user["sub"], 0)
+        return {"unread": 0}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error marking notifications read: {str(e)}")
+
+# Live notification stream (Server-Sent Events)
+@app.get("/api/notifications/stream")
+async def stream_notifications(
+    request: Request,
+    audience: str = Query("all", pattern=NOTIFICATION_AUDIENCES),
+):
+    # Subscribe before reading the backlog so nothing published in between is missed
+    subscriber = notification_hub.subscribe(audience)
+    backlog = []
+    try:
+        last_event_id = request.headers.get("last-event-id")
+        last_seen = last_event_id and await notifications_collection.find_one({"id": last_event_id}, {"created_at": 1})
+        if last_seen:
+            query = {**audience_filter(audience), "created_at": {"$gt": last_seen["created_at"]}}
+            backlog = await notifications_collection.find(query, {"_id": 0}).sort("created_at", 1).to_list(NOTIFICATION_REPLAY_LIMIT)
+    except Exception as e:
+        notification_hub.unsubscribe(subscriber)
+        raise HTTPException(status_code=500, detail=f"Error opening notification stream: {str(e)}")
+    return StreamingResponse(
+        notification_events(subscriber, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Create notification and push it to connected clients
+@app.post("/api/notifications", response_model=NotificationResponse)
+async def create_notification(notification: NotificationCreate):
+    try:
+        notification_dict = new_document(notification)
+        await notifications_collection.insert_one(notification_dict)
+        notification_dict.pop("_id", None)
+        await unread_cache.clear()
+        await shared_state.publish(NOTIFICATION_CHANNEL, notification_dict)
+        return notification_helper(notification_dict)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating notification: {str(e)}")
+
+# Mark one notification read
+@app.post("/api/notifications/{notification_id}/read")
+async def mark_notification_read(notification_id: str, user: dict = Depends(get_current_user)):
+    try:
+        notification = await notifications_collection.find_one({"id": notification_id}, {"_id": 0, "id": 1, "created_at": 1})
+        if not notification:
+            raise HTTPException(status_code=404, detail="Notification not found")
+        # Only notifications newer than the watermark need an exception entry
+        try:
+            await notification_reads_collection.update_one(
+                {"user_id": user["sub"], "last_read_at": {"$lt": notification["created_at"]}},
+                {"$addToSet": {"read_ids": notification_id}, "$setOnInsert": {"last_read_at": NEVER_READ}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # The user's watermark is already past this notification
+            pass
+        await unread_cache.invalidate(user["sub"])
+        return {"message": "Notification marked read", "notification_id": notification_id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error marking notification read: {str(e)}")
+
+# Class/term summaries read from the materialized grade_summaries collection
+@app.get("/api/reports/summary")
+async def get_grade_summaries(
+    studentClass: Optional[StudentClass] = None,
+    term: Optional[TermEnum] = None,
+):
+    try:
+        summaries = await grade_summaries_collection.find(
+            grade_filters(None, studentClass, term), {"_id": 0}
+        ).sort([("studentClass", 1), ("term", 1)]).to_list(None)
+        return [summary_helper(summary) for summary in summaries]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching grade summaries: {str(e)}")
+
+# Static site. It is the router's fallback rather than a catch-all mount, so it is
+# only reached after no route (and no trailing-slash redirect to one) matched, and
+# never for /api paths, which keep the router's JSON 404.
+if STATIC_SOURCE_DIR.is_dir():
+    static_site = PrecompressedStaticFiles(directory=STATIC_BUILD_DIR, html=True, check_dir=False)
+
+    async def serve_static_site(scope, receive, send):
+        if scope["type"] == "http" and not (scope["path"] == "/api" or scope["path"].startswith("/api/")):
+            await static_site(scope, receive, send)
+        else:
+            await app.router.not_found(scope, receive, send)
+
+    app.router.default = serve_static_site
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    # WEB_CONCURRENCY=N runs N worker processes, each importing this module itself.
+    # Under gunicorn (-k uvicorn.workers.UvicornWorker --preload) the import happens
+    # before the fork; the Mongo and Redis clients open no connections until first used.
+    if WEB_CONCURRENCY > 1 and not shared_state.shared:
+        logger.warning("Running %d workers with SHARED_STATE_URL=memory://: caches and ETags are per worker", WEB_CONCURRENCY)
+    uvicorn.run("server:app" if WEB_CONCURRENCY > 1 else app, host="0.0.0.0", port=8001, workers=WEB_CONCURRENCY)
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""State shared by every worker process: derived-data caches, counters and pub/sub.
+
+`memory://` (the default) keeps everything in the current process, which is
+only correct with a single worker. `redis://...` keeps it in Redis or any
+server speaking its protocol (Valkey, KeyDB, Dragonfly), so several uvicorn or
+gunicorn workers see the same caches, collection versions and notifications.
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+import orjson
+
+from cache import TTLCache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional: only needed for redis:// URLs
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """Async front for a per-process TTLCache, so callers don't care which backend is in use."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    async def get(self, key: str):
+        return self._cache.get(key)
+
+    async def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        self._cache.set(key, value, ttl)
+
+    async def invalidate(self, key: str) -> None:
+        self._cache.invalidate(key)
+
+    async def invalidate_prefix(self, prefix: str) -> None:
+        self._cache.invalidate_where(lambda key: key.startswith(prefix))
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "backend": "memory"}
+
+
+class MemoryState:
+    shared = False
+
+    def __init__(self):
+        self._values: Dict[str, str] = {}
+        self._channels: Dict[str, Set[asyncio.Queue]] = {}
+
+    def cache(self, name: str, maxsize: int, ttl: float) -> LocalCache:
+        return LocalCache(maxsize, ttl)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        return [self._values.get(key) for key in keys]
+
+    async def set(self, key: str, value) -> None:
+        self._values[key] = str(value)
+
+    async def incr(self, key: str) -> int:
+        value = int(self._values.get(key, 0)) + 1
+        self._values[key] = str(value)
+        return value
+
+    async def publish(self, channel: str, message: dict) -> None:
+        for queue in self._channels.get(channel, ()):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._channels.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._channels[channel].discard(queue)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisCache:
+    """Cache entries stored as JSON under `<prefix><key>`; hit/miss counts are per worker."""
+
+    def __init__(self, redis, prefix: str, ttl: float):
+        self._redis = redis
+        self._prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str):
+        value = await self._redis.get(self._prefix + key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return orjson.loads(value)
+
+    async def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        await self._redis.set(self._prefix + key, orjson.dumps(value), px=int((self.ttl if ttl is None else ttl) * 1000))
+
+    async def invalidate(self, key: str) -> None:
+        await self._redis.delete(self._prefix + key)
+
+    async def invalidate_prefix(self, prefix: str) -> None:
+        pattern = self._prefix + "".join(f"\\{char}" if char in "*?[]\\" else char for char in prefix) + "*"
+        keys = [key async for key in self._redis.scan_iter(match=pattern, count=500)]
+        if keys:
+            await self._redis.delete(*keys)
+
+    async def clear(self) -> None:
+        await self.invalidate_prefix("")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "backend": "redis",
+        }
+
+
+class RedisState:
+    shared = True
+
+    def __init__(self, url: str, namespace: str = "bright"):
+        if aioredis is None:
+            raise RuntimeError("SHARED_STATE_URL points at Redis but the redis package is not installed")
+        # Connections are opened lazily, so this is safe to create before workers fork
+        self.redis = aioredis.from_url(url)
+        self.namespace = namespace
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def cache(self, name: str, maxsize: int, ttl: float) -> RedisCache:
+        # Redis evicts by its own maxmemory policy; maxsize only applies in memory
+        return RedisCache(self.redis, self._key(f"cache:{name}:"), ttl)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        return [value.decode() if value is not None else None for value in await self.redis.mget([self._key(key) for key in keys])]
+
+    async def set(self, key: str, value) -> None:
+        await self.redis.set(self._key(key), str(value))
+
+    async def incr(self, key: str) -> int:
+        return await self.redis.incr(self._key(key))
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self.redis.publish(self._key(channel), orjson.dumps(message))
+
+    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._key(channel))
+        try:
+            async for message in pubsub.listen():
+                yield orjson.loads(message["data"])
+        finally:
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def create_state(url: str):
+    if url.startswith("memory://"):
+        return MemoryState()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisState(url)
+    raise ValueError(f"Unsupported SHARED_STATE_URL: {url}")
@@ -1,6 +1,8 @@
+import os
 import requests
 import sys
 import json
+import time
 from datetime import datetime
 
 class SchoolManagementAPITester:
@@ -10,10 +12,12 @@ class SchoolManagementAPITester:
         self.tests_passed = 0
         self.created_student_ids = []
 
-    def run_test(self, name, method, endpoint, expected_status, data=None, params=None):
+    def run_test(self, name, method, endpoint, expected_status, data=None, params=None, token=None):
         """Run a single API test"""
         url = f"{self.base_url}/{endpoint}"
         headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
 
         self.tests_run += 1
         print(f"\n🔍 Testing {name}...")
@@ -68,6 +72,49 @@ class SchoolManagementAPITester:
         )
         return success
 
+    def test_login_rejected(self):
+        """Login with unknown credentials is refused"""
+        success, _ = self.run_test(
+            "Login with Bad Credentials",
+            "POST",
+            "api/auth/login",
+            401,
+            data={"username": "no-such-user", "password": "wrong-password"}
+        )
+        return success
+
+    def test_admin_requires_token(self):
+        """Admin endpoints refuse anonymous requests"""
+        success, _ = self.run_test(
+            "Admin Cache Stats without Token",
+            "GET",
+            "api/admin/cache",
+            401
+        )
+        return success
+
+    def test_login(self, username, password):
+        """Log in and return the access token"""
+        success, response = self.run_test(
+            "Login",
+            "POST",
+            "api/auth/login",
+            200,
+            data={"username": username, "password": password}
+        )
+        return response.get('access_token') if success else None
+
+    def test_get_me(self, token):
+        """Current user from the access token"""
+        success, response = self.run_test(
+            "Get Current User",
+            "GET",
+            "api/auth/me",
+            200,
+            token=token
+        )
+        return success, response
+
     def test_get_students_empty(self):
         """Test getting students when database might be empty"""
         success, response = self.run_test(
@@ -78,6 +125,16 @@ class SchoolManagementAPITester:
         )
         return success, response
 
+    def test_trailing_slash_redirect(self):
+        """An API path with a trailing slash is redirected to the route, not served by the static site"""
+        success, response = self.run_test(
+            "Get Students with Trailing Slash",
+            "GET",
+            "api/students/",
+            200
+        )
+        return success
+
     def test_create_student(self, student_data):
         """Create a student"""
         success, response = self.run_test(
@@ -102,6 +159,59 @@ class SchoolManagementAPITester:
         )
         return success, response
 
+    def test_batch_get_students(self, student_ids):
+        """Get several students by ID in one request"""
+        success, response = self.run_test(
+            "Batch Get Students",
+            "POST",
+            "api/students/batch-get",
+            200,
+            data={"ids": student_ids}
+        )
+        return success, response
+
+    def test_partly_legacy_student(self, students):
+        """A legacy document updated after the schema change reads the same from every endpoint"""
+        student_id = f"legacy-test-{int(time.time())}"
+        now = datetime.utcnow()
+        students.insert_one({
+            "id": student_id,
+            "name": "Chisomo Old Phiri",
+            "class_name": "Standard 3",
+            "parent_name": "Grace Phiri",
+            "contact_phone": "+265-999-0100",
+            # Written later through the current API
+            "firstName": "Chisomo",
+            "studentClass": "Standard 4",
+            "created_at": now,
+            "updated_at": now,
+        })
+        try:
+            success, single = self.run_test(
+                "Get Partly Legacy Student",
+                "GET",
+                f"api/students/{student_id}",
+                200
+            )
+            if not success:
+                return False
+            success, batch = self.test_batch_get_students([student_id])
+            if not success:
+                return False
+            self.tests_run += 1
+            print("\n🔍 Testing Partly Legacy Student Reads Consistently...")
+            listed = batch.get('results', {}).get(student_id)
+            expected = {"firstName": "Chisomo", "lastName": "Old Phiri", "studentClass": "Standard 4",
+                        "parentName": "Grace Phiri", "parentPhone": "+265-999-0100"}
+            if listed != single or any(single.get(field) != value for field, value in expected.items()):
+                print(f"❌ Failed - GET gave {single}, batch-get gave {listed}")
+                return False
+            self.tests_passed += 1
+            print("✅ Passed - new fields win, legacy fields fill the rest")
+            return True
+        finally:
+            students.delete_one({"id": student_id})
+
     def test_update_student(self, student_id, update_data):
         """Update a student"""
         success, response = self.run_test(
@@ -123,6 +233,29 @@ class SchoolManagementAPITester:
         )
         return success
 
+    def test_bulk_import_csv(self, name, body, expected_inserted, expected_failed):
+        """Upload a CSV body to the bulk import and check how many rows went in and failed"""
+        url = f"{self.base_url}/api/students/bulk"
+        self.tests_run += 1
+        print(f"\n🔍 Testing {name}...")
+        print(f"   URL: {url}")
+        try:
+            response = requests.post(url, data=body.encode(), headers={'Content-Type': 'text/csv'})
+            result = response.json()
+        except Exception as e:
+            print(f"❌ Failed - Error: {str(e)}")
+            return False, {}
+        if response.status_code != 200:
+            print(f"❌ Failed - Expected 200, got {response.status_code}: {result}")
+            return False, result
+        if (result.get('inserted'), result.get('failed')) != (expected_inserted, expected_failed):
+            print(f"❌ Failed - Expected {expected_inserted} inserted / {expected_failed} failed, "
+                  f"got {result.get('inserted')} / {result.get('failed')}: {result.get('errors')}")
+            return False, result
+        self.tests_passed += 1
+        print(f"✅ Passed - {result['inserted']} inserted, {result['failed']} failed")
+        return True, result
+
     def test_get_stats(self):
         """Test statistics endpoint"""
         success, response = self.run_test(
@@ -133,6 +266,146 @@ class SchoolManagementAPITester:
         )
         return success, response
 
+    def test_create_grade(self, grade_data):
+        """Create a grade and check the stored average and letter grade"""
+        success, response = self.run_test(
+            "Create Grade",
+            "POST",
+            "api/grades",
+            200,
+            data=grade_data
+        )
+        if success:
+            scores = [grade_data[s] for s in ("english", "chichewa", "math", "science", "socialStudies")]
+            expected_average = round(sum(scores) / len(scores), 2)
+            if response.get('average') != expected_average:
+                print(f"❌ Expected average {expected_average}, got {response.get('average')}")
+                return False, response
+        return success, response
+
+    def test_create_duplicate_grade(self, grade_data):
+        """A second grade for the same student and term is refused, alone or in a batch"""
+        success, _ = self.run_test(
+            "Create Duplicate Grade",
+            "POST",
+            "api/grades",
+            409,
+            data=grade_data
+        )
+        if not success:
+            return False
+        success, response = self.run_test(
+            "Create Duplicate Grade in Batch",
+            "POST",
+            "api/grades/batch",
+            200,
+            data=[grade_data]
+        )
+        if success and (response.get('created') or len(response.get('errors', [])) != 1):
+            print(f"❌ Expected one row error and nothing created, got {response}")
+            return False
+        return success
+
+    def test_get_grades(self, student_id):
+        """Get grades for a student"""
+        success, response = self.run_test(
+            "Get Grades for Student",
+            "GET",
+            "api/grades",
+            200,
+            params={"studentId": student_id}
+        )
+        return success, response
+
+    def test_grade_summary(self, student_class, term):
+        """Check the stored class/term summary against the grades it summarizes"""
+        success, grades = self.run_test(
+            f"Get Grades - {student_class} / {term}",
+            "GET",
+            "api/grades",
+            200,
+            params={"studentClass": student_class, "term": term, "limit": 1000}
+        )
+        if not success:
+            return False
+        success, summaries = self.run_test(
+            f"Get Grade Summary - {student_class} / {term}",
+            "GET",
+            "api/reports/summary",
+            200,
+            params={"studentClass": student_class, "term": term}
+        )
+        if not success:
+            return False
+        self.tests_run += 1
+        print(f"\n🔍 Testing Grade Summary Matches Grades - {student_class} / {term}...")
+        error = None
+        if not grades:
+            if summaries:
+                error = f"Expected no summary for an empty group, got {summaries}"
+        elif len(summaries) != 1 or summaries[0]['count'] != len(grades):
+            error = f"Expected one summary of {len(grades)} grades, got {summaries}"
+        else:
+            for field in ("english", "chichewa", "math", "science", "socialStudies", "average"):
+                values = [grade[field] for grade in grades]
+                expected = {"mean": round(sum(values) / len(values), 2), "min": min(values), "max": max(values)}
+                actual = summaries[0][field]
+                if abs(actual['mean'] - expected['mean']) > 0.01 or (actual['min'], actual['max']) != (expected['min'], expected['max']):
+                    error = f"Summary {field} is {actual}, grades give {expected}"
+                    break
+        if error:
+            print(f"❌ Failed - {error}")
+            return False
+        self.tests_passed += 1
+        print(f"✅ Passed - {len(grades)} grades")
+        return True
+
+    def test_update_grade(self, grade_id, update_data):
+        """Update a grade"""
+        return self.run_test(
+            "Update Grade",
+            "PUT",
+            f"api/grades/{grade_id}",
+            200,
+            data=update_data
+        )
+
+    def test_delete_grade(self, grade_id):
+        """Delete a grade"""
+        success, _ = self.run_test(
+            "Delete Grade",
+            "DELETE",
+            f"api/grades/{grade_id}",
+            200
+        )
+        return success
+
+    def test_performance_report_job(self):
+        """Queue a performance report job and wait for its result"""
+        success, job = self.run_test(
+            "Queue Performance Report",
+            "POST",
+            "api/reports/performance",
+            202
+        )
+        if not success:
+            return False, job
+        for _ in range(60):
+            response = requests.get(f"{self.base_url}/api/reports/jobs/{job['id']}")
+            job = response.json()
+            if job.get("status") in ("done", "failed"):
+                break
+            time.sleep(1)
+        if job.get("status") != "done":
+            print(f"❌ Report job ended as {job.get('status')}: {job.get('error')}")
+            return False, job
+        return self.run_test(
+            "Get Performance Report Result",
+            "GET",
+            f"api/reports/jobs/{job['id']}/result",
+            200
+        )
+
     def test_get_students_populated(self):
         """Test getting students when database has data"""
         success, response = self.run_test(
@@ -198,6 +471,19 @@ def main():
         print("❌ Health check failed, stopping tests")
         return 1
 
+    # Test authentication. A real login needs an account (see backend/create_user.py):
+    # set BACKEND_TEST_USERNAME and BACKEND_TEST_PASSWORD to include it.
+    tester.test_login_rejected()
+    tester.test_admin_requires_token()
+    username = os.environ.get("BACKEND_TEST_USERNAME")
+    password = os.environ.get("BACKEND_TEST_PASSWORD")
+    if username and password:
+        token = tester.test_login(username, password)
+        if token:
+            success, me = tester.test_get_me(token)
+            if success:
+                print(f"   Logged in as {me.get('username')} ({me.get('role')})")
+
     # Test initial state
     success, initial_students = tester.test_get_students_empty()
     if not success:
@@ -205,6 +491,7 @@ def main():
         return 1
 
     print(f"\n📊 Initial state: {len(initial_students)} students in database")
+    tester.test_trailing_slash_redirect()
 
     # Test statistics with initial state
     success, initial_stats = tester.test_get_stats()
@@ -238,6 +525,20 @@ def main():
         if success:
             print(f"   Retrieved student: {student_data.get('firstName', 'N/A')} {student_data.get('lastName', '')}")
 
+    # Test fetching several students at once, plus an id that does not exist
+    if created_ids:
+        success, batch = tester.test_batch_get_students(created_ids + ["missing-id"])
+        if success:
+            print(f"   Found {len(batch.get('results', {}))} students, missing: {batch.get('missing')}")
+
+    # Test a partly updated legacy document. Legacy documents cannot be created
+    # through the API: set BACKEND_TEST_MONGO_URL (and DB_NAME) to the server's
+    # database to include it.
+    mongo_url = os.environ.get("BACKEND_TEST_MONGO_URL")
+    if mongo_url:
+        from pymongo import MongoClient
+        tester.test_partly_legacy_student(MongoClient(mongo_url)[os.environ.get("DB_NAME", "test_database")].students)
+
     # Test updating a student
     if created_ids:
         update_data = {
@@ -248,6 +549,81 @@ def main():
         if success:
             print(f"   Updated student class to: {updated_student.get('studentClass', 'N/A')}")
 
+    # Test grades for a student
+    if created_ids:
+        grade_data = {
+            "studentId": created_ids[0],
+            "term": "Term 1",
+            "english": 78,
+            "chichewa": 85,
+            "math": 92,
+            "science": 74,
+            "socialStudies": 69,
+            "comments": "Good progress"
+        }
+        success, grade = tester.test_create_grade(grade_data)
+        if success:
+            print(f"   Grade average: {grade.get('average')} ({grade.get('grade')})")
+        tester.test_create_duplicate_grade(grade_data)
+        success, grades = tester.test_get_grades(created_ids[0])
+        if success:
+            print(f"   Found {len(grades)} grades for student")
+        success, report = tester.test_performance_report_job()
+        if success:
+            print(f"   Performance report covers {len(report.get('groups', []))} class/term groups")
+
+    # Test that class/term summaries follow every grade write: a new maximum and
+    # minimum, an update and a delete of the extremes (min/max are recomputed),
+    # and a class change moving a student's grades to the other class's summary
+    summary_students = []
+    for first_name, scores in (("Dalitso", 99), ("Esnart", 41)):
+        student_id = tester.test_create_student({**test_students[1], "firstName": first_name, "studentClass": "Standard 6"})
+        if student_id:
+            summary_students.append((student_id, scores))
+    if len(summary_students) == 2:
+        summary_grades = []
+        for student_id, scores in summary_students:
+            grade_data = {"studentId": student_id, "term": "Term 3", "english": scores, "chichewa": scores,
+                          "math": scores, "science": scores, "socialStudies": scores}
+            success, grade = tester.test_create_grade(grade_data)
+            if success:
+                summary_grades.append(grade['id'])
+            tester.test_grade_summary("Standard 6", "Term 3")
+        if len(summary_grades) == 2:
+            tester.test_update_grade(summary_grades[1], {"math": 75, "english": 70})
+            tester.test_grade_summary("Standard 6", "Term 3")
+            tester.test_delete_grade(summary_grades[0])
+            tester.test_grade_summary("Standard 6", "Term 3")
+            tester.test_update_student(summary_students[1][0], {"studentClass": "Standard 7"})
+            tester.test_grade_summary("Standard 6", "Term 3")
+            tester.test_grade_summary("Standard 7", "Term 3")
+
+    # Test bulk import: a quoted field may span lines and contain escaped quotes,
+    # a stray quote inside an unquoted field is literal, and an unterminated quoted
+    # field is reported as a row error instead of silently swallowing the rest
+    header = "firstName,lastName,gender,dob,studentClass,enrollmentDate,parentName,relationship,parentPhone,address\n"
+
+    def csv_row(first_name, last_name, address="Area 25"):
+        return f"{first_name},{last_name},Female,2015-05-01,Standard 1,2024-01-10,Grace Banda,Mother,+265-999-0101,{address}\n"
+
+    tester.test_bulk_import_csv(
+        "Bulk Import with Multi-line Quoted Field",
+        header + csv_row("Chikondi", "Banda", '"Plot 12\nArea 25, ""Lilongwe"""') + csv_row("Thoko", "Banda"),
+        2, 0
+    )
+    tester.test_bulk_import_csv(
+        "Bulk Import with Stray Quote",
+        header + csv_row("Pat", 'O"Brien') + csv_row("Ann", "Banda") + csv_row("Joe", "Phiri"),
+        3, 0
+    )
+    success, result = tester.test_bulk_import_csv(
+        "Bulk Import with Unterminated Quote",
+        header + csv_row("Ann", "Phiri") + csv_row("Joe", "Mwale", '"Plot 4') + csv_row("Kim", "Mwale"),
+        1, 1
+    )
+    if success:
+        print(f"   Row error: {result['errors'][0]}")
+
     # Test statistics after adding students
     success, final_stats = tester.test_get_stats()
     if success:
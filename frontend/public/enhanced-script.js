@@ -234,8 +234,8 @@ function initializePortalComponents() {
     // Initialize form handlers
     initializePortalForms();
     
-    // Load notifications
-    loadNotifications();
+    // Load notifications, then keep them live over the notification stream
+    loadNotifications().then(subscribeToNotifications);
 }
 
 // Initialize forms for main site
@@ -848,6 +848,17 @@ async function loadNotifications() {
     }
 }
 
+// Receive new notifications as they are created instead of polling
+function subscribeToNotifications() {
+    if (!window.EventSource) return;
+
+    const stream = new EventSource(`${API_BASE_URL}/api/notifications/stream`);
+    stream.addEventListener('notification', (event) => {
+        notifications.unshift(JSON.parse(event.data));
+        displayNotifications();
+    });
+}
+
 // Display notifications
 function displayNotifications() {
     // Implementation for displaying notifications in UI
@@ -0,0 +1,143 @@
+"""Change feed counters against a real MongoDB: the polling fallback and resuming after a restart.
+
+Uses MONGO_URL (default mongodb://localhost:27017) and a throwaway database per
+test; skipped when no server is reachable.
+
+    python -m pytest tests/test_change_feed.py
+"""
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from change_feed import ChangeFeed  # noqa: E402
+
+COUNTED = {"students": {"studentClass": ["studentClass", "class_name"], "gender": ["gender"]}}
+
+
+def run(test):
+    async def main():
+        client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), serverSelectionTimeoutMS=1000)
+        try:
+            await client.admin.command("ping")
+        except PyMongoError:
+            client.close()
+            pytest.skip("MongoDB is not reachable")
+        name = f"change_feed_test_{uuid.uuid4().hex[:8]}"
+        try:
+            await test(client[name])
+        finally:
+            await client.drop_database(name)
+            client.close()
+
+    asyncio.run(main())
+
+
+def student(gender="Female", **fields) -> dict:
+    return {"id": str(uuid.uuid4()), "gender": gender, "updated_at": datetime.utcnow(), **fields}
+
+
+def make_feed(db, changes=None, counted=COUNTED) -> ChangeFeed:
+    async def on_change(name, documents):
+        if changes is not None:
+            changes.append(name)
+
+    return ChangeFeed(db, counted, on_change, poll_seconds=0.05, save_seconds=0, pre_images=False)
+
+
+async def wait_for(condition, timeout=10.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out waiting for the change feed"
+        await asyncio.sleep(0.05)
+
+
+async def stop(task):
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_polling_counts_legacy_class():
+    async def test(db):
+        await db.students.insert_many([
+            student(studentClass="PP1"),
+            student(gender="Male", class_name="Standard 3"),
+            student(),
+        ])
+        changes = []
+        feed = make_feed(db, changes)
+        task = asyncio.create_task(feed.poll(await feed.load()))
+        try:
+            await wait_for(lambda: feed.ready)
+            counter = feed.counters["students"]
+            assert feed.mode == "polling"
+            assert counter.total == 3
+            assert counter.by_field["studentClass"] == {"PP1": 1, "Standard 3": 1, "unknown": 1}
+            assert counter.by_field["gender"] == {"Female": 2, "Male": 1}
+
+            await db.students.insert_one(student(class_name="Standard 3"))
+            await wait_for(lambda: feed.counters["students"].total == 4)
+            assert feed.counters["students"].by_field["studentClass"]["Standard 3"] == 2
+            assert changes == ["students"]
+
+            # The dashboard's direct count, used while the feed is not ready, agrees
+            counted = await feed.count("students")
+            assert (counted.total, counted.by_field) == (4, feed.counters["students"].by_field)
+        finally:
+            await stop(task)
+
+    run(test)
+
+
+def test_resume_after_restart():
+    async def test(db):
+        kept = student(studentClass="PP1")
+        removed = student(class_name="Standard 3")
+        await db.students.insert_many([kept, removed])
+        feed = make_feed(db)
+        task = asyncio.create_task(feed.poll(await feed.load()))
+        await wait_for(lambda: feed.ready)
+        await stop(task)
+        await feed.save()
+
+        # Changes made while no worker was running
+        await db.students.delete_one({"id": removed["id"]})
+        await db.students.insert_many([student(class_name="Standard 4"), student(gender="Male", studentClass="PP1")])
+
+        restarted = make_feed(db)
+        missing = await restarted.load()
+        assert missing == []
+        assert restarted.counters["students"].by_field == {
+            "studentClass": {"PP1": 1, "Standard 3": 1},
+            "gender": {"Female": 2},
+        }
+        task = asyncio.create_task(restarted.poll(missing))
+        try:
+            await wait_for(lambda: restarted.ready and restarted.counters["students"].total == 3)
+            assert restarted.counters["students"].by_field["studentClass"] == {"PP1": 2, "Standard 4": 1}
+        finally:
+            await stop(task)
+
+    run(test)
+
+
+def test_counters_saved_for_other_fields_are_recounted():
+    async def test(db):
+        await db.students.insert_one(student(class_name="Standard 3"))
+        feed = make_feed(db, counted={"students": {"studentClass": ["studentClass"]}})
+        await feed.recount("students")
+        await feed.save()
+        assert feed.counters["students"].by_field["studentClass"] == {"unknown": 1}
+
+        restarted = make_feed(db)
+        assert await restarted.load() == ["students"]
+        assert restarted.resume_token is None
+
+    run(test)